@@ -0,0 +1,239 @@
+"""Throughput/latency/memory benchmark for the cipher engines.
+
+Runs encrypt and decrypt of every cipher over a sweep of input sizes and key
+lengths, prints a table, optionally saves the results as JSON and compares
+them against a stored baseline:
+
+    python benchmarks/bench_ciphers.py --json results.json
+    python benchmarks/bench_ciphers.py --sizes 1K,1M --baseline results.json --tolerance 0.15
+
+Sizes above `--stream-above` (32M by default) are measured through
+`encrypt_stream`/`decrypt_stream` over 1M chunks, so the 1G case runs in
+bounded memory; those rows are marked "(stream)".
+
+The exit status is 1 when any case is slower than the baseline by more than
+the tolerance, so the script can gate CI jobs.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic import CaesarCipher, VigenereCipher, PlayfairCipher  # noqa: E402
+from logic.__main__ import parse_size  # noqa: E402
+
+CIPHERS = {
+    "caesar": CaesarCipher,
+    "vigenere": VigenereCipher,
+    "playfair": PlayfairCipher,
+}
+DEFAULT_SIZES = "1K,32K,1M,32M,1G"
+DEFAULT_KEY_LENGTHS = "1,8,32"
+# Larger inputs are fed through encrypt_stream/decrypt_stream in STREAM_CHUNK
+# pieces instead of one call: one-shot Playfair peaks at about 28x its input size
+DEFAULT_STREAM_ABOVE = "32M"
+STREAM_CHUNK = 1 << 20
+
+
+def make_text(size, seed=0):
+    """Deterministic English-like ASCII text of `size` characters."""
+    rng = random.Random(seed)
+    words = ("the quick brown fox jumps over lazy dog attack at dawn meet me "
+             "by the old bookkeeper's balloon shop, Hello World! 1984").split()
+    block = []
+    length = 0
+    while length < min(size, 1 << 16):
+        word = rng.choice(words)
+        block.append(word)
+        length += len(word) + 1
+    block = " ".join(block)
+    return (block * (size // len(block) + 1))[:size]
+
+
+def make_key(cipher_name, length, seed=0):
+    if cipher_name == "caesar":
+        return 3
+    rng = random.Random(seed)
+    return "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(length))
+
+
+def measure(func, arg, key, repeat):
+    """Returns (best seconds per call, median seconds per call, output) of `func(arg, key)`."""
+    times = []
+    output = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func(arg, key)
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times), output
+
+
+def measure_peak_memory(func, arg, key):
+    tracemalloc.start()
+    try:
+        func(arg, key)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _drain(stream):
+    """Wraps a stream method as `func(chunks, key)` that consumes its output."""
+    def run(chunks, key):
+        for _ in stream(chunks, key):
+            pass
+    return run
+
+
+def _repeat_chunks(chunk, size, tail):
+    # The same chunk object repeated, so the input never exists in memory as a whole
+    count, rest = divmod(size, STREAM_CHUNK)
+    return [chunk] * count + ([tail] if rest else [])
+
+
+def run_benchmarks(ciphers, sizes, key_lengths, repeat=3, memory=True, log=print,
+                   stream_above=parse_size(DEFAULT_STREAM_ABOVE)):
+    results = []
+    for name in ciphers:
+        cipher = CIPHERS[name]()
+        lengths = [1] if name == "caesar" else key_lengths
+        for size in sizes:
+            streamed = size > stream_above
+            if streamed:
+                chunk = make_text(STREAM_CHUNK)
+                tail = chunk[:size % STREAM_CHUNK]
+                text = _repeat_chunks(chunk, size, tail)
+                encrypt, decrypt = _drain(cipher.encrypt_stream), _drain(cipher.decrypt_stream)
+            else:
+                text = make_text(size)
+                encrypt, decrypt = cipher.encrypt, cipher.decrypt
+            # Large inputs take long enough per call that one run is representative
+            runs = repeat if size <= (16 << 20) else 1
+            for key_length in lengths:
+                key = make_key(name, key_length)
+                best, median, ciphertext = measure(encrypt, text, key, runs)
+                if streamed:
+                    # Every encrypted chunk is valid ciphertext on its own (even length for Playfair)
+                    ciphertext = _repeat_chunks(cipher.encrypt(chunk, key), size, cipher.encrypt(tail, key))
+                cases = [("encrypt", encrypt, text, best, median)]
+                best, median, _ = measure(decrypt, ciphertext, key, runs)
+                cases.append(("decrypt", decrypt, ciphertext, best, median))
+                for mode, func, arg, best, median in cases:
+                    row = {
+                        "cipher": name,
+                        "mode": mode,
+                        "size": size,
+                        "key_length": key_length,
+                        "api": "stream" if streamed else "call",
+                        "throughput_mb_s": size / best / 1e6 if best > 0 else float("inf"),
+                        "latency_s": median,
+                        "peak_memory_bytes": measure_peak_memory(func, arg, key) if memory else None,
+                    }
+                    results.append(row)
+                    log(format_row(row))
+                del ciphertext
+    return results
+
+
+def format_row(row):
+    memory = row["peak_memory_bytes"]
+    memory = f"{memory / 1e6:10.1f} MB" if memory is not None else "         -"
+    api = " (stream)" if row.get("api") == "stream" else ""
+    return (f"{row['cipher']:<9} {row['mode']:<8} {row['size']:>11} B  key={row['key_length']:<3} "
+            f"{row['throughput_mb_s']:10.2f} MB/s  {row['latency_s'] * 1e3:10.3f} ms  {memory}{api}")
+
+
+def case_id(row):
+    return (row["cipher"], row["mode"], row["size"], row["key_length"])
+
+
+def compare(results, baseline, tolerance):
+    """Returns the cases whose throughput dropped more than `tolerance` (a fraction) below the baseline."""
+    reference = {case_id(row): row for row in baseline}
+    regressions = []
+    for row in results:
+        base = reference.get(case_id(row))
+        if base is None:
+            continue
+        limit = base["throughput_mb_s"] * (1 - tolerance)
+        if row["throughput_mb_s"] < limit:
+            regressions.append((row, base))
+    return regressions
+
+
+def environment():
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy_version,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ciphers", default=",".join(CIPHERS),
+                        help="comma-separated ciphers (default: all)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"comma-separated input sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--max-size", type=parse_size, default=None,
+                        help="skip sizes above this limit")
+    parser.add_argument("--stream-above", type=parse_size, default=DEFAULT_STREAM_ABOVE,
+                        help="measure larger sizes through encrypt_stream/decrypt_stream in 1M chunks, "
+                             f"so memory stays bounded (default: {DEFAULT_STREAM_ABOVE})")
+    parser.add_argument("--key-lengths", default=DEFAULT_KEY_LENGTHS,
+                        help=f"comma-separated key lengths for keyword ciphers (default: {DEFAULT_KEY_LENGTHS})")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory pass")
+    parser.add_argument("--json", metavar="PATH", help="save the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed throughput drop versus the baseline (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    ciphers = [c.strip() for c in args.ciphers.split(",") if c.strip()]
+    unknown = sorted(set(ciphers) - set(CIPHERS))
+    if unknown:
+        parser.error(f"unknown cipher(s): {', '.join(unknown)}")
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+    if args.max_size:
+        sizes = [s for s in sizes if s <= args.max_size]
+    key_lengths = [int(k) for k in args.key_lengths.split(",")]
+
+    results = run_benchmarks(ciphers, sizes, key_lengths, args.repeat, not args.no_memory,
+                             stream_above=args.stream_above)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for row, base in regressions:
+            print(f"REGRESSION {row['cipher']} {row['mode']} size={row['size']} key={row['key_length']}: "
+                  f"{row['throughput_mb_s']:.2f} MB/s vs baseline {base['throughput_mb_s']:.2f} MB/s",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} of the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Cold-start import cost of the package, measured with `python -X importtime`.
+
+Each module is imported in a fresh interpreter several times; the median
+cumulative import time, the process wall time and the heaviest imports are
+reported. Results can be saved as JSON, appended to a history file to track
+them over time, and compared against a baseline:
+
+    python benchmarks/bench_startup.py --json startup.json --history startup-history.jsonl
+    python benchmarks/bench_startup.py --baseline startup.json --tolerance 0.25
+
+The exit status is 1 when any module got slower to import than the baseline
+by more than the tolerance.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_ciphers import environment  # noqa: E402
+
+DEFAULT_MODULES = "logic,logic.caesar,logic.vigenere,logic.playfair,logic.__main__,main_gui"
+
+
+def parse_importtime(stderr):
+    """Parses `-X importtime` output into `(self_us, cumulative_us, depth, name)` tuples."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The header line
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(fields[0]), int(fields[1]), depth, name.strip()))
+    return entries
+
+
+def _import_run(statement):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                          cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, parse_importtime(proc.stderr)
+
+
+def import_cost(module, entries):
+    """Cumulative microseconds of the top-level imports made by `import module`."""
+    parts = module.split(".")
+    names = {".".join(parts[:i]) for i in range(1, len(parts) + 1)}
+    return sum(cumulative for _, cumulative, depth, name in entries if depth == 0 and name in names)
+
+
+def measure_startup(modules, runs=5, top=5):
+    # Interpreter startup imports (site, encodings, ...) are excluded from the heaviest list
+    startup_wall, startup_entries = _import_run("pass")
+    startup = {name for *_, name in startup_entries}
+    results = []
+    for module in modules:
+        walls, costs = [], []
+        heaviest = {}
+        for _ in range(runs):
+            wall, entries = _import_run(f"import {module}")
+            walls.append(wall)
+            costs.append(import_cost(module, entries))
+            for self_us, _, _, name in entries:
+                if name not in startup:
+                    heaviest.setdefault(name, []).append(self_us)
+        ranked = sorted(((statistics.median(v), name) for name, v in heaviest.items()), reverse=True)
+        results.append({
+            "module": module,
+            "import_us": statistics.median(costs),
+            "wall_s": statistics.median(walls),
+            "interpreter_wall_s": startup_wall,
+            "heaviest": [[name, us] for us, name in ranked[:top]],
+        })
+    return results
+
+
+def format_row(row):
+    heaviest = ", ".join(f"{name} {us / 1e3:.1f}ms" for name, us in row["heaviest"][:3])
+    return (f"{row['module']:<16} {row['import_us'] / 1e3:9.2f} ms import  "
+            f"{row['wall_s'] * 1e3:8.1f} ms process   {heaviest}")
+
+
+def compare(results, baseline, tolerance):
+    """Returns the modules whose import time grew more than `tolerance` (a fraction) over the baseline."""
+    reference = {row["module"]: row for row in baseline}
+    regressions = []
+    for row in results:
+        base = reference.get(row["module"])
+        if base is not None and row["import_us"] > base["import_us"] * (1 + tolerance):
+            regressions.append((row, base))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", default=DEFAULT_MODULES,
+                        help=f"comma-separated modules to import (default: {DEFAULT_MODULES})")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module (median is kept)")
+    parser.add_argument("--json", metavar="PATH", help="save the results as JSON")
+    parser.add_argument("--history", metavar="PATH", help="append the results as one JSON line")
+    parser.add_argument("--baseline", metavar="PATH", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed import time increase versus the baseline (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    modules = [m.strip() for m in args.modules.split(",") if m.strip()]
+    results = measure_startup(modules, args.runs)
+    for row in results:
+        print(format_row(row))
+    record = {"environment": environment(), "results": results}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(record, f, indent=2)
+    if args.history:
+        with open(args.history, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for row, base in regressions:
+            print(f"REGRESSION {row['module']}: {row['import_us'] / 1e3:.2f} ms vs baseline "
+                  f"{base['import_us'] / 1e3:.2f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} of the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,43 @@
-from .caesar import CaesarCipher
-from .vigenere import VigenereCipher
-from .playfair import PlayfairCipher
+"""Classical ciphers: Caesar, Vigenère and Playfair.
+
+Cipher modules are imported on first use, so `import logic` stays cheap for
+short-lived processes. Look ciphers up by name with `get_cipher`, or import
+the classes as attributes as before (`from logic import CaesarCipher`).
+"""
+import importlib
+
+# Registry: cipher name -> (module, class name)
+CIPHERS = {
+    "caesar": ("caesar", "CaesarCipher"),
+    "vigenere": ("vigenere", "VigenereCipher"),
+    "playfair": ("playfair", "PlayfairCipher"),
+}
+
+# Other lazily resolved attributes: name -> (module, attribute)
+_LAZY_ATTRIBUTES = {class_name: (module, class_name) for module, class_name in CIPHERS.values()}
+_LAZY_ATTRIBUTES["key_cache"] = ("cipher_base", "key_cache")
+
+__all__ = ["CIPHERS", "get_cipher", "key_cache", *(class_name for _, class_name in CIPHERS.values())]
+
+
+def get_cipher(name):
+    """Returns the cipher class registered as `name` (e.g. "vigenere"), importing it on first use."""
+    try:
+        module, class_name = CIPHERS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown cipher {name!r}; expected one of {', '.join(CIPHERS)}.")
+    return getattr(importlib.import_module(f".{module}", __name__), class_name)
+
+
+def __getattr__(name):
+    try:
+        module, attribute = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), attribute)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
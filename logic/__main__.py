@@ -0,0 +1,154 @@
+"""Headless command-line interface: python -m logic {encrypt,decrypt} ...
+
+Only the `logic` package is imported, so this runs without a display.
+"""
+import argparse
+import mmap
+import os
+import sys
+import time
+
+from . import CIPHERS, get_cipher
+from .cipher_base import DEFAULT_CHUNK_SIZE
+
+
+def parse_size(value):
+    """Parses sizes such as 65536, 64K, 8M or 1G."""
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    value = value.strip().upper()
+    try:
+        if value and value[-1] in units:
+            size = int(value[:-1]) * units[value[-1]]
+        else:
+            size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}")
+    if size <= 0:
+        raise argparse.ArgumentTypeError("size must be positive")
+    return size
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m logic",
+                                     description="Encrypt or decrypt text with a classical cipher.")
+    parser.add_argument("mode", choices=("encrypt", "decrypt"))
+    parser.add_argument("-c", "--cipher", required=True, choices=sorted(CIPHERS))
+    parser.add_argument("-k", "--key", required=True,
+                        help="integer shift for caesar, keyword for vigenere/playfair")
+    parser.add_argument("-i", "--input", default="-", help="input file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--chunk-size", type=parse_size, default=DEFAULT_CHUNK_SIZE,
+                        help="bytes processed per chunk (default: 1M)")
+    parser.add_argument("--mmap", action="store_true",
+                        help="memory-map the input file instead of reading it")
+    parser.add_argument("--in-place", action="store_true",
+                        help="rewrite the input file through a memory mapping (caesar, vigenere); "
+                             "an interrupted run resumes from its .ckpt checkpoint")
+    parser.add_argument("--stats", action="store_true",
+                        help="report size, time and throughput on stderr")
+    return parser
+
+
+def _mapped_chunks(mapping, chunk_size):
+    # Slicing copies one chunk at a time, so no buffer export outlives the mapping
+    if hasattr(mapping, "madvise"):
+        mapping.madvise(mmap.MADV_SEQUENTIAL)
+    for start in range(0, len(mapping), chunk_size):
+        yield mapping[start:start + chunk_size]
+
+
+class _CountingReader:
+    """Iterates over a binary file in chunks while counting the bytes read."""
+
+    def __init__(self, src, chunk_size):
+        self.src = src
+        self.chunk_size = chunk_size
+        self.count = 0
+
+    def __iter__(self):
+        read = self.src.read
+        while True:
+            chunk = read(self.chunk_size)
+            if not chunk:
+                return
+            self.count += len(chunk)
+            yield chunk
+
+
+def run(args, stdin=None, stdout=None):
+    stdin = stdin if stdin is not None else sys.stdin.buffer
+    stdout = stdout if stdout is not None else sys.stdout.buffer
+    cipher = get_cipher(args.cipher)()
+    if args.in_place:
+        return _run_in_place(args, cipher)
+    transform = cipher.encrypt_stream if args.mode == "encrypt" else cipher.decrypt_stream
+    # A bad key must fail before the output file is created or truncated
+    key = cipher.compile(args.key)
+    if (args.input != "-" and args.output != "-" and os.path.exists(args.output)
+            and os.path.samefile(args.input, args.output)):
+        raise ValueError("Input and output are the same file; use --in-place to rewrite it.")
+
+    src = stdin if args.input == "-" else open(args.input, "rb")
+    dst = stdout if args.output == "-" else open(args.output, "wb")
+    mapping = None
+    bytes_in = bytes_out = 0
+    start = time.perf_counter()
+    try:
+        if args.mmap and args.input != "-" and os.fstat(src.fileno()).st_size > 0:
+            mapping = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+            bytes_in = len(mapping)
+            chunks = _mapped_chunks(mapping, args.chunk_size)
+        else:
+            chunks = _CountingReader(src, args.chunk_size)
+        for out in transform(chunks, key):
+            dst.write(out)
+            bytes_out += len(out)
+        if mapping is None:
+            bytes_in = chunks.count
+        dst.flush()
+    finally:
+        if mapping is not None:
+            mapping.close()
+        if src is not stdin:
+            src.close()
+        if dst is not stdout:
+            dst.close()
+    elapsed = time.perf_counter() - start
+
+    if args.stats:
+        _print_stats(args, bytes_in, bytes_out, elapsed)
+    return 0
+
+
+def _run_in_place(args, cipher):
+    from .files import transform_in_place
+    if args.input == "-" or args.output != "-":
+        raise ValueError("--in-place needs an input file (-i) and no output (-o).")
+    start = time.perf_counter()
+    count = transform_in_place(args.input, cipher, args.key, args.mode == "decrypt", window=args.chunk_size)
+    if args.stats:
+        _print_stats(args, count, count, time.perf_counter() - start)
+    return 0
+
+
+def _print_stats(args, bytes_in, bytes_out, elapsed):
+    rate = bytes_in / elapsed / 1e6 if elapsed > 0 else float("inf")
+    print(f"{args.cipher} {args.mode}: {bytes_in} bytes in, {bytes_out} bytes out, "
+          f"{elapsed:.3f} s, {rate:.1f} MB/s", file=sys.stderr)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return run(args)
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into `head`); silence the final flush too
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Frequency analysis helpers used by the cipher crackers."""
+import math
+import string
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; histograms fall back to str.count
+    np = None
+
+# Relative letter frequencies of English text, A-Z
+ENGLISH_FREQUENCIES = (
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015,
+    0.06094, 0.06966, 0.00153, 0.00772, 0.04025, 0.02406, 0.06749,
+    0.07507, 0.01929, 0.00095, 0.05987, 0.06327, 0.09056, 0.02758,
+    0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+)
+_LOG_FREQUENCIES = tuple(math.log(f) for f in ENGLISH_FREQUENCIES)
+_ASCII_LETTERS = frozenset(string.ascii_letters)
+_BYTES_NON_LETTERS = bytes(c for c in range(256) if chr(c) not in _ASCII_LETTERS)
+
+
+def letter_histogram(text):
+    """Counts of the letters A-Z in `text` (str or bytes-like), case-folded, in one pass."""
+    if isinstance(text, str):
+        if not text.isascii():
+            return [text.count(u) + text.count(l)
+                    for u, l in zip(string.ascii_uppercase, string.ascii_lowercase)]
+        text = text.encode('ascii')
+    if np is not None:
+        # Clearing bit 5 folds lower case onto upper case
+        folded = np.frombuffer(text, dtype=np.uint8) & 0xDF
+        letters = folded[(folded - ord('A')) < 26] - ord('A')
+        return np.bincount(letters, minlength=26).tolist()
+    upper = bytes(text).upper()
+    return [upper.count(c) for c in string.ascii_uppercase.encode('ascii')]
+
+
+def chi_squared(counts, expected=ENGLISH_FREQUENCIES):
+    """Chi-squared distance between letter `counts` and the `expected` relative frequencies (lower is better)."""
+    total = sum(counts)
+    if total == 0:
+        return 0.0
+    return sum((c - total * e) ** 2 / (total * e) for c, e in zip(counts, expected))
+
+
+def log_likelihood(counts, log_expected=_LOG_FREQUENCIES):
+    """Log-likelihood of letter `counts` under the expected log frequencies (higher is better)."""
+    return sum(c * e for c, e in zip(counts, log_expected))
+
+
+def shift_scores(histogram, method="chi2"):
+    """Scores all 26 Caesar shifts of a ciphertext from its letter histogram.
+
+    Decrypting with shift `s` maps ciphertext letter `(i + s) % 26` to
+    plaintext letter `i`, so each candidate is scored on the histogram rotated
+    by `s`; no trial decryption is needed. Returns a list of `(shift, score)`
+    ordered from the most to the least likely shift.
+    """
+    if method not in ("chi2", "loglik"):
+        raise ValueError("method must be 'chi2' or 'loglik'.")
+    score = chi_squared if method == "chi2" else log_likelihood
+    scores = [(shift, score(histogram[shift:] + histogram[:shift])) for shift in range(26)]
+    scores.sort(key=lambda item: item[1], reverse=method == "loglik")
+    return scores
+
+
+RANDOM_IOC = 1 / 26
+
+# Key length estimation only needs a sample of the ciphertext
+_PERIOD_SAMPLE = 1 << 20
+_KASISKI_SAMPLE = 1 << 18
+
+
+def letter_indices(text):
+    """The letters of `text` as alphabet indices 0-25, case-folded, non-letters dropped.
+
+    Returns a uint8 NumPy array when NumPy is available, else an uppercase str.
+    """
+    if isinstance(text, str):
+        if not text.isascii():
+            text = "".join(c for c in text if c in _ASCII_LETTERS)
+        text = text.encode('ascii')
+    if np is not None:
+        folded = np.frombuffer(text, dtype=np.uint8) & 0xDF
+        return folded[(folded - ord('A')) < 26] - ord('A')
+    return bytes(text).translate(None, _BYTES_NON_LETTERS).decode('ascii').upper()
+
+
+def _column_counts(letters, period):
+    """Per-column letter counts (period x 26) of `letters` read with the given period."""
+    if np is not None:
+        n = letters.size - letters.size % period
+        # Column j, letter c -> bin j * 26 + c
+        bins = letters[:n].reshape(-1, period) + (np.arange(period, dtype=np.int32) * 26)
+        counts = np.bincount(bins.ravel(), minlength=26 * period).reshape(period, 26)
+        tail = letters[n:]
+        counts[np.arange(tail.size), tail] += 1
+        return counts.tolist()
+    return [[letters[j::period].count(c) for c in string.ascii_uppercase] for j in range(period)]
+
+
+def index_of_coincidence(counts):
+    total = sum(counts)
+    if total < 2:
+        return 0.0
+    return sum(c * (c - 1) for c in counts) / (total * (total - 1))
+
+
+def period_ioc(letters, max_period):
+    """Average column index of coincidence for every period 1..max_period."""
+    letters = letters[:_PERIOD_SAMPLE]
+    result = {}
+    for period in range(1, max_period + 1):
+        columns = _column_counts(letters, period)
+        result[period] = sum(map(index_of_coincidence, columns)) / period
+    return result
+
+
+def kasiski_scores(letters, max_period):
+    """Fraction of repeated-trigram distances divisible by each period 2..max_period.
+
+    Trigrams are hashed to integer codes; repeats are found by grouping equal
+    codes (sort or dict) instead of comparing every pair of positions.
+    """
+    letters = letters[:_KASISKI_SAMPLE]
+    if len(letters) < 3:
+        return {p: 0.0 for p in range(2, max_period + 1)}
+    if np is not None:
+        a = letters.astype(np.int32)
+        codes = a[:-2] * 676 + a[1:-1] * 26 + a[2:]
+        order = np.argsort(codes, kind='stable')
+        same = codes[order][1:] == codes[order][:-1]
+        distances = (order[1:] - order[:-1])[same]
+        if distances.size == 0:
+            return {p: 0.0 for p in range(2, max_period + 1)}
+        return {p: float(np.count_nonzero(distances % p == 0)) / distances.size
+                for p in range(2, max_period + 1)}
+    last_seen = {}
+    distances = []
+    for i in range(len(letters) - 2):
+        trigram = letters[i:i+3]
+        if trigram in last_seen:
+            distances.append(i - last_seen[trigram])
+        last_seen[trigram] = i
+    if not distances:
+        return {p: 0.0 for p in range(2, max_period + 1)}
+    return {p: sum(1 for d in distances if d % p == 0) / len(distances)
+            for p in range(2, max_period + 1)}
+
+
+def estimate_key_length(letters, max_period=40):
+    """Estimates the Vigenère key length of the ciphertext letters.
+
+    Periods whose column IoC comes close to the best one are candidates (the
+    true period and its multiples all look like English); among them the one
+    with the strongest Kasiski support wins, ties going to the shorter key.
+    Returns `(key_length, ranking)` where ranking lists
+    `(period, ioc, kasiski)` from the most to the least likely.
+    """
+    max_period = max(1, min(max_period, len(letters) // 2))
+    ioc = period_ioc(letters, max_period)
+    kasiski = kasiski_scores(letters, max_period)
+    kasiski[1] = 1.0  # every distance is a multiple of 1
+    best = max(ioc.values())
+    threshold = RANDOM_IOC + 0.9 * (best - RANDOM_IOC)
+    def rank(p):
+        candidate = ioc[p] >= threshold
+        return candidate, kasiski[p] if candidate else ioc[p], -p
+    ranking = sorted(ioc, key=rank, reverse=True)
+    return ranking[0], [(p, ioc[p], kasiski[p]) for p in ranking]
+
+
+def solve_columns(letters, key_length, method="chi2"):
+    """Solves each key position as a Caesar problem; returns the key shifts."""
+    columns = _column_counts(letters, key_length)
+    return [shift_scores(counts, method)[0][0] for counts in columns]
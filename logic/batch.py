@@ -0,0 +1,131 @@
+"""Batched encryption of N messages under M keys with 2-D array operations.
+
+Messages are packed into one zero-padded (N, L) array of character codes,
+and the key schedules into arrays of shifts or stacked digraph tables; all
+N x M results are then computed by broadcasting, without a Python loop over
+keys or characters. Use it through `Cipher.encrypt_batch`/`decrypt_batch`.
+
+The result arrays hold N * M * L codes, so very large grids should be
+processed in slices of messages or keys. Requires NumPy.
+"""
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # Cipher.encrypt_batch falls back to one call per message and key
+    np = None
+
+# Result of the batch kernels: `codes` is an (N, M, L) array of character
+# codes, zero-padded; message i under key j is `codes[i, j, :lengths[i]]`
+BatchResult = namedtuple("BatchResult", ["codes", "lengths"])
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Batch arrays require NumPy.")
+
+
+def pack_texts(messages):
+    """Packs str or bytes-like `messages` into a zero-padded (N, L) code array; returns `(codes, lengths)`.
+
+    All-ASCII input gives uint8 codes, anything else uint32 code points.
+    """
+    _require_numpy()
+    wide = any(isinstance(m, str) and not m.isascii() for m in messages)
+    if wide:
+        dtype = np.uint32
+        encoded = [(m if isinstance(m, str) else bytes(m).decode('latin-1')).encode('utf-32-le') for m in messages]
+    else:
+        dtype = np.uint8
+        encoded = [m.encode('ascii') if isinstance(m, str) else bytes(m) for m in messages]
+    itemsize = np.dtype(dtype).itemsize
+    lengths = np.array([len(e) // itemsize for e in encoded], dtype=np.intp)
+    codes = np.zeros((len(messages), lengths.max(initial=0)), dtype=dtype)
+    # Row-major boolean assignment fills each row's prefix in order
+    codes[np.arange(codes.shape[1]) < lengths[:, None]] = np.frombuffer(b"".join(encoded), dtype=dtype)
+    return codes, lengths
+
+
+def to_texts(result, messages):
+    """Unpacks a `BatchResult` into rows of texts, one row per message, typed like that message."""
+    codes, lengths = result
+    wide = codes.dtype == np.uint32
+    rows = []
+    for i, message in enumerate(messages):
+        n = int(lengths[i])
+        # One decode per message; the M results are slices of it
+        raw = codes[i, :, :n].tobytes()
+        text = raw.decode('utf-32-le') if wide else raw.decode('latin-1')
+        if not isinstance(message, str):
+            text = text.encode('latin-1')
+        rows.append([text[j * n:(j + 1) * n] for j in range(codes.shape[1])])
+    return rows
+
+
+def _shift_letters(codes, shifts):
+    """Shifts the ASCII letters of `codes` (N, 1, L) by `shifts` (broadcastable to (N, M, L))."""
+    letters = ((codes | 32) - ord('a')) < 26
+    base = (codes & 32) | ord('A')
+    # Non-letters wrap around here, but are restored by the mask
+    shifted = (codes - base + shifts) % 26 + base
+    return np.where(letters, shifted, codes)
+
+
+def caesar_batch(messages, shifts):
+    """Shifts every message by every shift in `shifts`; returns a `BatchResult`."""
+    codes, lengths = pack_texts(messages)
+    shifts = (np.asarray(shifts, dtype=np.int64) % 26).astype(codes.dtype)
+    return BatchResult(_shift_letters(codes[:, None, :], shifts[None, :, None]), lengths)
+
+
+def vigenere_batch(messages, key_shifts):
+    """Applies every sequence of per-letter shifts in `key_shifts` to every message; returns a `BatchResult`."""
+    codes, lengths = pack_texts(messages)
+    key_lengths = np.array([len(shifts) for shifts in key_shifts], dtype=np.intp)
+    table = np.zeros((len(key_shifts), key_lengths.max(initial=1)), dtype=codes.dtype)
+    table[np.arange(table.shape[1]) < key_lengths[:, None]] = [s % 26 for shifts in key_shifts for s in shifts]
+    # Key position of each character: the number of letters before it (non-letters do not advance the key)
+    letters = ((codes | 32) - ord('a')) < 26
+    position = np.cumsum(letters, axis=1, dtype=np.intp) - 1
+    grid = table[np.arange(len(key_shifts))[None, :, None], position[:, None, :] % key_lengths[None, :, None]]
+    return BatchResult(_shift_letters(codes[:, None, :], grid), lengths)
+
+
+def playfair_tables(keys, decrypt=False):
+    """Stacked digraph tables of the compiled `keys`: an (M, 26, 26, 2) array of result letters.
+
+    Entry [m, a, b] is the digraph that letters a, b (0-25, J as I) become under key m.
+    """
+    _require_numpy()
+    count = len(keys)
+    matrix = np.frombuffer("".join("".join(key.matrix_chars) for key in keys).encode('ascii'),
+                           dtype=np.uint8).reshape(count, 25)
+    position = np.zeros((count, 26), dtype=np.intp)
+    position[np.arange(count)[:, None], matrix - ord('A')] = np.arange(25)
+    position[:, ord('J') - ord('A')] = position[:, ord('I') - ord('A')]
+    row, col = np.divmod(position, 5)
+    r1, c1 = row[:, :, None], col[:, :, None]
+    r2, c2 = row[:, None, :], col[:, None, :]
+    step = -1 if decrypt else 1
+    same_row = r1 == r2
+    same_col = ~same_row & (c1 == c2)
+    # Same row: move along the row; same column: along the column; else swap columns
+    new_r1 = np.where(same_col, (r1 + step) % 5, r1)
+    new_r2 = np.where(same_col, (r2 + step) % 5, r2)
+    new_c1 = np.where(same_row, (c1 + step) % 5, np.where(same_col, c1, c2))
+    new_c2 = np.where(same_row, (c2 + step) % 5, np.where(same_col, c2, c1))
+    m = np.arange(count)[:, None, None]
+    return np.stack([matrix[m, new_r1 * 5 + new_c1], matrix[m, new_r2 * 5 + new_c2]], axis=-1)
+
+
+def playfair_batch(digraph_texts, keys, decrypt=False):
+    """Translates the digraph texts (even-length, A-Z without J) under every compiled key; returns a `BatchResult`."""
+    codes, lengths = pack_texts(digraph_texts)
+    tables = playfair_tables(keys, decrypt)
+    valid = np.arange(codes.shape[1]) < lengths[:, None]
+    letters = np.where(valid, codes.astype(np.intp) - ord('A'), 0)
+    first, second = letters[:, None, 0::2], letters[:, None, 1::2]
+    out = tables[np.arange(len(keys))[None, :, None], first, second]
+    out = out.reshape(len(digraph_texts), len(keys), codes.shape[1])
+    out[np.broadcast_to(~valid[:, None, :], out.shape)] = 0
+    return BatchResult(out, lengths)
@@ -1,40 +1,143 @@
-from .cipher_base import Cipher
+import string
+from collections import namedtuple
+from functools import lru_cache
+
+from . import metrics
+from .cipher_base import Cipher, DEFAULT_CHUNK_SIZE, byte_view, iter_chunks
+
+UPPER = string.ascii_uppercase
+LOWER = string.ascii_lowercase
+LETTERS = frozenset(UPPER + LOWER)
+
+
+@lru_cache(maxsize=26)
+def _str_table(shift):
+    """Translation table for str input, built once per shift (0-25)."""
+    return str.maketrans(UPPER + LOWER,
+                         UPPER[shift:] + UPPER[:shift] + LOWER[shift:] + LOWER[:shift])
+
+
+@lru_cache(maxsize=26)
+def _bytes_table(shift):
+    """Translation table for bytes-like input, built once per shift (0-25)."""
+    return bytes.maketrans((UPPER + LOWER).encode("ascii"),
+                           (UPPER[shift:] + UPPER[:shift] + LOWER[shift:] + LOWER[:shift]).encode("ascii"))
+
+
+def caesar_translate(text, shift):
+    """Shifts every ASCII letter of `text` by `shift` in a single translate call.
+
+    `text` may be a str or a bytes-like object; the result has the same type
+    (bytearray/memoryview input returns bytes).
+    """
+    shift %= 26
+    if isinstance(text, str):
+        return text.translate(_str_table(shift))
+    return bytes(text).translate(_bytes_table(shift))
+
+
+# A compiled Caesar key: the shift 0-25
+CaesarKey = namedtuple("CaesarKey", ["shift"])
+
+# Result of CaesarCipher.crack: the best shift, its decryption and all
+# (shift, score) pairs from most to least likely
+CaesarCrack = namedtuple("CaesarCrack", ["shift", "plaintext", "ranking"])
+
 
 class CaesarCipher(Cipher):
-    def encrypt(self, plaintext, key):
-        self._clear_steps()
+    key_type = CaesarKey
+    preserves_length = True
+
+    def _compile_key(self, key):
         try:
-            shift = int(key) % 26
+            return CaesarKey(int(key) % 26)
         except ValueError:
             raise ValueError("Key for Caesar Cipher must be an integer.")
 
-        result = []
-        for char in plaintext:
-            if char.isalpha():
-                base = ord('A') if char.isupper() else ord('a')
-                new_char = chr((ord(char) - base + shift) % 26 + base)
-                result.append(new_char)
-                self._add_step(f"{char} -> {new_char} (Shift {shift})")
-            else:
-                result.append(char)
-        
-        return "".join(result)
+    def encrypt(self, plaintext, key):
+        return self._shift_text(plaintext, key, "encrypt")[0]
 
     def decrypt(self, ciphertext, key):
-        self._clear_steps()
-        try:
-            shift = int(key) % 26
-        except ValueError:
-            raise ValueError("Key for Caesar Cipher must be an integer.")
+        return self._shift_text(ciphertext, key, "decrypt")[0]
+
+    def encrypt_traced(self, plaintext, key):
+        result, shift, run = self._shift_text(plaintext, key, "encrypt")
+        return self._result(result, run.steps(lambda: self._format_steps(plaintext, result, f"Shift {shift}")))
+
+    def decrypt_traced(self, ciphertext, key):
+        result, _, run = self._shift_text(ciphertext, key, "decrypt")
+        return self._result(result, run.steps(lambda: self._format_steps(ciphertext, result, "Inverse Shift")))
+
+    def _shift_text(self, text, key, mode):
+        """Returns `(result, shift, metrics run)`."""
+        run = metrics.start(self, mode)
+        shift = self.compile(key).shift
+        run.lap("key")
+        result = caesar_translate(text, -shift if mode == "decrypt" else shift)
+        run.lap("substitute", len(text))
+        return result, shift, run
+
+    def encrypt_into(self, src, key, out=None):
+        return self._translate_into(src, self.compile(key).shift, out)
+
+    def decrypt_into(self, src, key, out=None):
+        return self._translate_into(src, -self.compile(key).shift, out)
+
+    def _transform_window(self, buf, key, decrypt, phase):
+        shift = self.compile(key).shift
+        self._translate_into(buf, -shift if decrypt else shift, None)
+        return 0
+
+    def _translate_into(self, src, shift, out):
+        src = byte_view(src)
+        dst = self._output_view(src, out, len(src))
+        table = _bytes_table(shift % 26)
+        # Block-wise, so temporaries stay small whatever the buffer size
+        for start in range(0, len(src), DEFAULT_CHUNK_SIZE):
+            end = min(start + DEFAULT_CHUNK_SIZE, len(src))
+            dst[start:end] = src[start:end].tobytes().translate(table)
+        return len(src)
+
+    def _batch_arrays(self, batch, messages, keys, decrypt):
+        return batch.caesar_batch(messages, [-key.shift if decrypt else key.shift for key in keys])
+
+    def crack(self, ciphertext, method="chi2"):
+        """Recovers the shift of a Caesar ciphertext by frequency analysis.
+
+        One letter histogram of the ciphertext is scored for all 26 shifts
+        ("chi2" or "loglik" against English), then only the winning shift is
+        decrypted.
+        """
+        # Imported here so plain encryption never loads the analysis helpers (and NumPy)
+        from .analysis import letter_histogram, shift_scores
+        ranking = shift_scores(letter_histogram(ciphertext), method)
+        shift = ranking[0][0]
+        return CaesarCrack(shift, caesar_translate(ciphertext, -shift), ranking)
+
+    def encrypt_stream(self, source, key, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Encrypts a file object or iterable of chunks, yielding one output chunk per input chunk."""
+        return self._stream(source, key, "encrypt", chunk_size)
+
+    def decrypt_stream(self, source, key, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Decrypts a file object or iterable of chunks, yielding one output chunk per input chunk."""
+        return self._stream(source, key, "decrypt", chunk_size)
+
+    def _stream(self, source, key, mode, chunk_size):
+        run = metrics.start(self, mode)
+        shift = self.compile(key).shift
+        run.lap("key")
+        return self._translate_chunks(source, -shift if mode == "decrypt" else shift, chunk_size, run)
+
+    def _translate_chunks(self, source, shift, chunk_size, run):
+        for chunk in iter_chunks(source, chunk_size):
+            run.mark()
+            result = caesar_translate(chunk, shift)
+            run.lap("substitute", len(chunk))
+            yield result
 
-        result = []
-        for char in ciphertext:
-            if char.isalpha():
-                base = ord('A') if char.isupper() else ord('a')
-                new_char = chr((ord(char) - base - shift) % 26 + base)
-                result.append(new_char)
-                self._add_step(f"{char} -> {new_char} (Inverse Shift)")
-            else:
-                result.append(char)
-        
-        return "".join(result)
+    def _format_steps(self, source, result, label):
+        if not isinstance(source, str):
+            source, result = bytes(source).decode('latin-1'), result.decode('latin-1')
+        for char, new_char in zip(source, result):
+            if char in LETTERS:
+                yield f"{char} -> {new_char} ({label})"
@@ -1,6 +1,177 @@
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict, deque, namedtuple
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+DEFAULT_KEY_CACHE_SIZE = 1024
+
+
+def iter_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yields the non-empty chunks of `source`.
+
+    `source` is either a file object (anything with a `read` method, read
+    `chunk_size` units at a time) or an iterable of str/bytes chunks. A
+    single str or bytes object is treated as one chunk.
+    """
+    if isinstance(source, (str, bytes, bytearray, memoryview)):
+        if len(source):
+            yield source
+        return
+    read = getattr(source, 'read', None)
+    if read is None:
+        for chunk in source:
+            if len(chunk):
+                yield chunk
+        return
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def byte_view(buffer, writable=False):
+    """A flat unsigned-byte memoryview of any buffer-protocol object."""
+    view = memoryview(buffer)
+    if not view.c_contiguous:
+        raise ValueError("Buffer must be C-contiguous.")
+    if writable and view.readonly:
+        raise TypeError("Output buffer must be writable (e.g. a bytearray); got a read-only buffer.")
+    return view.cast('B') if view.format != 'B' or view.ndim != 1 else view
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+
+class KeyCache:
+    """Thread-safe LRU cache of compiled keys.
+
+    `maxsize` of None means unbounded and 0 disables caching. Compilation
+    runs outside the lock; if two threads miss on the same key at once, the
+    first stored result is kept and returned to both.
+    """
+
+    def __init__(self, maxsize=DEFAULT_KEY_CACHE_SIZE):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._check_size(maxsize)
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, factory):
+        """Returns the entry for `key`, calling `factory()` to build it on a miss."""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+        value = factory()
+        with self._lock:
+            if self.maxsize != 0:
+                value = self._entries.setdefault(key, value)
+                self._evict()
+        return value
+
+    def resize(self, maxsize):
+        """Changes the size limit, evicting the least recently used entries if needed."""
+        self._check_size(maxsize)
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        """Drops all entries and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._entries))
+
+    def _evict(self):
+        if self.maxsize is None:
+            return
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _check_size(self, maxsize):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be a non-negative integer or None.")
+
+
+# Process-wide cache shared by every cipher instance
+key_cache = KeyCache()
+
+
+class CipherResult:
+    """The output of a traced cipher call together with its step trace.
+
+    Results are immutable, so a cipher instance can serve many threads: each
+    call gets its own result instead of sharing per-instance trace state.
+    """
+
+    __slots__ = ("text", "_step_source", "_steps", "_trace_limit", "_animation_source")
+
+    def __init__(self, text, step_source=None, trace="lazy", trace_limit=None, animation_source=None):
+        self.text = text
+        self._trace_limit = trace_limit
+        self._step_source = None
+        self._steps = ()
+        self._animation_source = None
+        if step_source is None or trace == "off":
+            return
+        self._animation_source = animation_source
+        if trace == "lazy":
+            self._step_source = step_source
+        else:
+            self._steps = tuple(deque(step_source(), maxlen=trace_limit))
+
+    def iter_steps(self):
+        """Iterates over the step strings, formatting them lazily if possible.
+
+        With a trace limit only the last `trace_limit` steps are returned.
+        """
+        if self._step_source is None:
+            return iter(self._steps)
+        if self._trace_limit is None:
+            return self._step_source()
+        return iter(deque(self._step_source(), maxlen=self._trace_limit))
+
+    @property
+    def steps(self):
+        return list(self.iter_steps())
+
+    @property
+    def animation(self):
+        """Cipher-specific animation data (Playfair: matrix and per-pair details), or None."""
+        return self._animation_source() if self._animation_source is not None else None
+
 
 class Cipher(ABC):
+    # Trace kept by encrypt_traced/decrypt_traced (encrypt/decrypt never trace):
+    # "off":  no trace
+    # "lazy": steps are formatted on demand from the call's input/output
+    # "full": steps are formatted eagerly during the call
+    TRACE_MODES = ("off", "lazy", "full")
+    # Type of the compiled key objects returned by `compile`
+    key_type = None
+    # Whether the output has exactly one byte per input byte, so files can be transformed in place
+    preserves_length = False
+
+    def __init__(self, trace="lazy", trace_limit=None):
+        if trace not in self.TRACE_MODES:
+            raise ValueError(f"Unknown trace mode {trace!r}; expected one of {', '.join(self.TRACE_MODES)}.")
+        if trace_limit is not None and trace_limit < 1:
+            raise ValueError("trace_limit must be a positive integer or None.")
+        self.trace = trace
+        self.trace_limit = trace_limit
+
     @abstractmethod
     def encrypt(self, plaintext, key):
         pass
@@ -9,18 +180,101 @@ class Cipher(ABC):
     def decrypt(self, ciphertext, key):
         pass
 
-    def _sanitize_text(self, text):
-        """Removes non-alphabetic characters and converts to uppercase."""
-        return "".join(filter(str.isalpha, text)).upper()
+    def compile(self, key):
+        """Returns the compiled key schedule for `key`, served from `key_cache`.
+
+        Every method taking a key also accepts a compiled one, which skips
+        key parsing and the cache lookup altogether.
+        """
+        if isinstance(key, self.key_type):
+            return key
+        key = self._normalize_key(key)
+        return key_cache.get((self.key_type, key), lambda: self._compile_key(key))
+
+    def _normalize_key(self, key):
+        """Validates `key` and returns the form it is cached and compiled under; keys
+        with the same normal form share one cache entry."""
+        return key
+
+    @abstractmethod
+    def _compile_key(self, key):
+        """Builds the compiled key (an instance of `key_type`) from a normalized key."""
+
+    @abstractmethod
+    def encrypt_traced(self, plaintext, key):
+        """Like `encrypt`, but returns a `CipherResult` carrying the step trace."""
+
+    @abstractmethod
+    def decrypt_traced(self, ciphertext, key):
+        """Like `decrypt`, but returns a `CipherResult` carrying the step trace."""
+
+    def _result(self, text, step_source, animation_source=None):
+        """Wraps `text` and a zero-argument step iterator factory according to the trace settings."""
+        return CipherResult(text, step_source, self.trace, self.trace_limit, animation_source)
+
+    def encrypt_into(self, src, key, out=None):
+        """Encrypts the bytes of `src` into the writable buffer `out`.
+
+        Without `out`, `src` is transformed in place. Returns the number of
+        bytes written; `output_size` tells how large `out` must be.
+        """
+        return self._write_into(self.encrypt(byte_view(src), key), src, out)
+
+    def decrypt_into(self, src, key, out=None):
+        """Decrypts the bytes of `src` into `out` (default: in place); returns the number of bytes written."""
+        return self._write_into(self.decrypt(byte_view(src), key), src, out)
+
+    def encrypt_batch(self, messages, keys, as_array=False):
+        """Encrypts every message under every key; returns one row of M results per message.
+
+        With NumPy the whole grid is computed with array operations (see
+        `logic.batch`); `as_array=True` returns the raw `BatchResult` arrays
+        instead of texts.
+        """
+        return self._run_batch(messages, keys, False, as_array)
+
+    def decrypt_batch(self, messages, keys, as_array=False):
+        """Decrypts every message under every key; see `encrypt_batch`."""
+        return self._run_batch(messages, keys, True, as_array)
+
+    def _run_batch(self, messages, keys, decrypt, as_array):
+        from . import batch  # NumPy is only loaded once batches are used
+        messages = list(messages)
+        keys = [self.compile(key) for key in keys]
+        if batch.np is not None:
+            result = self._batch_arrays(batch, messages, keys, decrypt)
+            return result if as_array else batch.to_texts(result, messages)
+        if as_array:
+            batch._require_numpy()
+        transform = self.decrypt if decrypt else self.encrypt
+        return [[transform(message, key) for key in keys] for message in messages]
+
+    @abstractmethod
+    def _batch_arrays(self, batch, messages, keys, decrypt):
+        """Computes a `batch.BatchResult` for compiled `keys`."""
+
+    def output_size(self, src, decrypt=False):
+        """Number of bytes `encrypt_into`/`decrypt_into` write for `src`."""
+        return byte_view(src).nbytes
+
+    def max_output_size(self, size, decrypt=False):
+        """Upper bound of the output size for `size` input bytes, known without reading the input."""
+        return size
 
-    def _get_intermediate_steps(self):
-        """Returns a list of steps taken during the last operation."""
-        return getattr(self, '_steps', [])
+    def _transform_window(self, buf, key, decrypt, phase):
+        """Transforms the writable buffer `buf` in place as the part of a longer
+        input that starts at key position `phase`; returns the key position
+        after it. Only ciphers with `preserves_length` implement this; it is
+        never called on the others.
+        """
+        raise NotImplementedError
 
-    def _add_step(self, step):
-        if not hasattr(self, '_steps'):
-            self._steps = []
-        self._steps.append(step)
+    def _output_view(self, src, out, size):
+        dst = byte_view(src if out is None else out, writable=True)
+        if len(dst) < size:
+            raise ValueError(f"Output buffer too small: need {size} bytes, got {len(dst)}.")
+        return dst
 
-    def _clear_steps(self):
-        self._steps = []
+    def _write_into(self, result, src, out):
+        self._output_view(src, out, len(result))[:len(result)] = result
+        return len(result)
@@ -0,0 +1,152 @@
+"""Memory-mapped file transformation.
+
+`transform_in_place` rewrites an ASCII/Latin-1 file with a length-preserving
+cipher (Caesar, Vigenère) window by window through a memory mapping, so the
+file is never read into memory as a whole. Before each window a sidecar
+checkpoint is written with the byte offset, the key phase and the window's
+original bytes; calling it again after an interruption (an exception or a
+crash) restores that window and resumes from the checkpoint.
+
+`transform_file` writes to a separate output file of preallocated size and
+works for every cipher, including Playfair, whose output length differs.
+"""
+import hashlib
+import json
+import mmap
+import os
+
+# Bytes transformed per window; rounded up to the mapping granularity
+DEFAULT_WINDOW_SIZE = 16 << 20
+CHECKPOINT_VERSION = 1
+
+
+def _window_size(window):
+    if window <= 0:
+        raise ValueError("window must be a positive number of bytes.")
+    granularity = mmap.ALLOCATIONGRANULARITY
+    return -(-window // granularity) * granularity
+
+
+def _key_digest(compiled):
+    # The checkpoint identifies the key without storing it
+    return hashlib.sha256(repr(compiled).encode("utf-8")).hexdigest()
+
+
+def read_checkpoint(path):
+    """Returns `(header, undo_bytes)` from a checkpoint file, or None if there is none."""
+    try:
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            undo = f.read()
+    except FileNotFoundError:
+        return None
+    if header.get("version") != CHECKPOINT_VERSION or len(undo) != header.get("undo", 0):
+        raise ValueError(f"Checkpoint {path} is damaged or from an incompatible version.")
+    return header, undo
+
+
+def _write_checkpoint(path, header, undo):
+    # Written to a temporary file and renamed, so a crash leaves the old or the new checkpoint
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(json.dumps(dict(header, undo=len(undo))).encode("utf-8") + b"\n")
+        f.write(undo)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def transform_in_place(path, cipher, key, decrypt=False, window=DEFAULT_WINDOW_SIZE,
+                       checkpoint=None, progress=None):
+    """Encrypts or decrypts the file at `path` in place; returns the number of bytes transformed by this call.
+
+    `cipher` must preserve length (`cipher.preserves_length`). The checkpoint
+    (default: `path + ".ckpt"`) is removed once the whole file is done; an
+    existing one must match the cipher, key, direction and file size.
+    `progress(offset, size)` is called after each window.
+    """
+    if not cipher.preserves_length:
+        raise ValueError(f"{type(cipher).__name__} changes the text length; use transform_file instead.")
+    compiled = cipher.compile(key)
+    window = _window_size(window)
+    checkpoint = checkpoint or path + ".ckpt"
+    size = os.path.getsize(path)
+    header = {
+        "version": CHECKPOINT_VERSION,
+        "cipher": type(cipher).__name__,
+        "mode": "decrypt" if decrypt else "encrypt",
+        "key": _key_digest(compiled),
+        "size": size,
+    }
+    offset = phase = 0
+    saved = read_checkpoint(checkpoint)
+    if saved is not None:
+        state, undo = saved
+        if any(state.get(name) != value for name, value in header.items()):
+            raise ValueError(f"Checkpoint {checkpoint} belongs to a different cipher, key, direction or file.")
+        offset, phase = state["offset"], state["phase"]
+    if size == 0:
+        return 0
+
+    with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0) as mapping:
+        if hasattr(mapping, "madvise"):
+            mapping.madvise(mmap.MADV_SEQUENTIAL)
+        if saved is not None and undo:
+            # The window in flight may be partly written: restore its original bytes
+            mapping[offset:offset + len(undo)] = undo
+            mapping.flush(offset, len(undo))
+        start = offset
+        # True while the checkpoint's undo bytes are needed to recover the current window
+        in_flight = False
+        try:
+            while offset < size:
+                end = min(offset + window, size)
+                original = mapping[offset:end]
+                _write_checkpoint(checkpoint, dict(header, offset=offset, phase=phase), original)
+                in_flight = True
+                # Transformed in a copy, so the mapping only ever sees whole windows
+                buf = bytearray(original)
+                next_phase = cipher._transform_window(buf, compiled, decrypt, phase)
+                mapping[offset:end] = buf
+                mapping.flush(offset, end - offset)
+                offset, phase = end, next_phase
+                in_flight = False
+                if progress is not None:
+                    progress(offset, size)
+        finally:
+            if offset < size and not in_flight:
+                _write_checkpoint(checkpoint, dict(header, offset=offset, phase=phase), b"")
+    os.remove(checkpoint)
+    return size - start
+
+
+def transform_file(src_path, dst_path, cipher, key, decrypt=False, window=DEFAULT_WINDOW_SIZE):
+    """Encrypts or decrypts `src_path` into `dst_path` through memory mappings; returns the output size.
+
+    The output file is preallocated to `cipher.max_output_size` and truncated
+    to the bytes actually written at the end.
+    """
+    compiled = cipher.compile(key)
+    transform = cipher.decrypt_stream if decrypt else cipher.encrypt_stream
+    window = _window_size(window)
+    size = os.path.getsize(src_path)
+    bound = cipher.max_output_size(size, decrypt)
+    written = 0
+    with open(src_path, "rb") as src, open(dst_path, "w+b") as dst:
+        if bound == 0:
+            return 0  # Empty input; an empty mapping is not allowed
+        dst.truncate(bound)
+        try:
+            with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as source, \
+                    mmap.mmap(dst.fileno(), bound) as target:
+                if hasattr(source, "madvise"):
+                    source.madvise(mmap.MADV_SEQUENTIAL)
+                windows = (source[start:start + window] for start in range(0, size, window))
+                for out in transform(windows, compiled):
+                    target[written:written + len(out)] = out
+                    written += len(out)
+                target.flush()
+        finally:
+            # Also on errors, so no preallocated tail is left behind
+            dst.truncate(written)
+    return written
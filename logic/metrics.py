@@ -0,0 +1,215 @@
+"""Per-phase timing and call counters for every cipher and mode.
+
+Collection is off by default; a disabled call costs a few no-op method
+calls. Switch it on with the environment variable CIPHER_METRICS=1, with
+`enable()`, or for a block:
+
+    from logic import metrics
+    with metrics.collect():
+        VigenereCipher().encrypt(text, "LEMON")
+    metrics.snapshot()       # {"vigenere": {"encrypt": {"calls": 1, "chars": ..., "phases": {...}}}}
+    print(metrics.prometheus())
+
+Phases are "key" (compiling or looking up the key), "prepare" (normalizing
+and padding the text; Playfair only), "substitute" (the substitution
+itself) and "format" (building the step trace, timed while it is consumed).
+Times come from the monotonic `time.perf_counter_ns`.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+ENV_VAR = "CIPHER_METRICS"
+PHASES = ("key", "prepare", "substitute", "format")
+
+_clock = time.perf_counter_ns
+_lock = threading.Lock()
+_calls = {}   # (cipher, mode) -> [calls, chars]
+_phases = {}  # (cipher, mode, phase) -> [runs, total_ns, max_ns]
+
+enabled = os.environ.get(ENV_VAR, "") not in ("", "0")
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    """Drops everything collected so far."""
+    with _lock:
+        _calls.clear()
+        _phases.clear()
+
+
+@contextmanager
+def collect(clear=False):
+    """Enables collection inside the block, restoring the previous setting afterwards.
+
+    With `clear=True` earlier numbers are dropped first, so the block's
+    calls are reported alone.
+    """
+    global enabled
+    previous = enabled
+    if clear:
+        reset()
+    enabled = True
+    try:
+        yield
+    finally:
+        enabled = previous
+
+
+def _record(cipher, mode, phase, elapsed, chars=0):
+    with _lock:
+        if chars:
+            _calls.setdefault((cipher, mode), [0, 0])[1] += chars
+        entry = _phases.get((cipher, mode, phase))
+        if entry is None:
+            _phases[(cipher, mode, phase)] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+
+
+class _Run:
+    """Times the phases of one call; each `lap` charges the time since the previous mark to a phase."""
+
+    __slots__ = ("cipher", "mode", "_mark")
+
+    def __init__(self, cipher, mode):
+        self.cipher = cipher
+        self.mode = mode
+        self._mark = _clock()
+
+    def mark(self):
+        """Starts the next phase now, e.g. after time spent outside the cipher."""
+        self._mark = _clock()
+
+    def lap(self, phase, chars=0):
+        now = _clock()
+        _record(self.cipher, self.mode, phase, now - self._mark, chars)
+        self._mark = now
+
+    def steps(self, step_source):
+        """Wraps a step iterator factory so that producing the steps is timed as "format"."""
+        def timed():
+            steps = step_source()
+            elapsed = 0
+            try:
+                while True:
+                    start = _clock()
+                    try:
+                        step = next(steps)
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += _clock() - start
+                    yield step
+            finally:
+                _record(self.cipher, self.mode, "format", elapsed)
+        return timed
+
+
+class _Off:
+    """Stand-in for `_Run` while collection is disabled."""
+
+    __slots__ = ()
+
+    def mark(self):
+        pass
+
+    def lap(self, phase, chars=0):
+        pass
+
+    def steps(self, step_source):
+        return step_source
+
+
+_OFF = _Off()
+
+
+def start(cipher, mode):
+    """Counts one call of the `cipher` instance in `mode` ("encrypt"/"decrypt") and returns its phase timer."""
+    if not enabled:
+        return _OFF
+    name = type(cipher).__name__
+    name = (name[:-len("Cipher")] if name.endswith("Cipher") else name).lower()
+    with _lock:
+        entry = _calls.get((name, mode))
+        if entry is None:
+            _calls[(name, mode)] = [1, 0]
+        else:
+            entry[0] += 1
+    return _Run(name, mode)
+
+
+def snapshot():
+    """The collected numbers as nested dicts: cipher -> mode -> calls, chars and per-phase runs/seconds."""
+    with _lock:
+        calls = {key: list(value) for key, value in _calls.items()}
+        phases = {key: list(value) for key, value in _phases.items()}
+    result = {}
+    for (cipher, mode), (count, chars) in sorted(calls.items()):
+        result.setdefault(cipher, {})[mode] = {"calls": count, "chars": chars, "phases": {}}
+    for (cipher, mode, phase), (runs, total, longest) in phases.items():
+        entry = result.setdefault(cipher, {}).setdefault(mode, {"calls": 0, "chars": 0, "phases": {}})
+        entry["phases"][phase] = {"runs": runs, "seconds": total / 1e9, "max_seconds": longest / 1e9}
+    for modes in result.values():
+        for entry in modes.values():
+            entry["phases"] = dict(sorted(entry["phases"].items(), key=lambda item: _phase_order(item[0])))
+    return result
+
+
+def _phase_order(phase):
+    return PHASES.index(phase) if phase in PHASES else len(PHASES)
+
+
+def prometheus():
+    """The collected numbers in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{val}"' for key, val in labels)
+            lines.append(f"{name}{{{label_text}}} {value}")
+
+    per_mode = [((("cipher", cipher), ("mode", mode)), entry)
+                for cipher, modes in data.items() for mode, entry in modes.items()]
+    per_phase = [(labels + (("phase", phase),), stats)
+                 for labels, entry in per_mode for phase, stats in entry["phases"].items()]
+    family("cipher_calls_total", "counter", "Cipher calls.",
+           [(labels, entry["calls"]) for labels, entry in per_mode])
+    family("cipher_chars_total", "counter", "Input characters processed.",
+           [(labels, entry["chars"]) for labels, entry in per_mode])
+    family("cipher_phase_runs_total", "counter", "Times each phase ran.",
+           [(labels, stats["runs"]) for labels, stats in per_phase])
+    family("cipher_phase_seconds_total", "counter", "Time spent in each phase.",
+           [(labels, repr(stats["seconds"])) for labels, stats in per_phase])
+    family("cipher_phase_max_seconds", "gauge", "Longest single run of each phase.",
+           [(labels, repr(stats["max_seconds"])) for labels, stats in per_phase])
+    return "\n".join(lines) + "\n"
+
+
+def format_table(data=None):
+    """A plain-text table of `snapshot()` (or `data`), one line per cipher, mode and phase."""
+    data = snapshot() if data is None else data
+    lines = []
+    for cipher, modes in data.items():
+        for mode, entry in modes.items():
+            lines.append(f"{cipher} {mode}: {entry['calls']} calls, {entry['chars']} chars")
+            for phase, stats in entry["phases"].items():
+                lines.append(f"  {phase:<10} {stats['seconds'] * 1e3:9.3f} ms  "
+                             f"x{stats['runs']:<5} max {stats['max_seconds'] * 1e3:.3f} ms")
+    return "\n".join(lines)
@@ -1,143 +1,283 @@
-from .cipher_base import Cipher
+import re
 
-class PlayfairCipher(Cipher):
-    def _create_matrix(self, key):
-        key = self._sanitize_text(key).replace('J', 'I')
-        alphabet = "ABCDEFGHIKLMNOPQRSTUVWXYZ"
+from . import metrics
+from .cipher_base import Cipher, DEFAULT_CHUNK_SIZE, iter_chunks
+
+ALPHABET = "ABCDEFGHIKLMNOPQRSTUVWXYZ"
+
+_NON_LETTERS = re.compile(r'[^A-Za-z]+')
+_NON_MATRIX_LETTERS = re.compile(r'[^A-Z]+')
+_BYTES_NON_LETTERS = bytes(c for c in range(256) if not chr(c).isascii() or not chr(c).isalpha())
+_PAIRS = re.compile(r'..', re.S)
+# Zero-width match at every letter that is followed by the same letter
+_DOUBLED = re.compile(r'(?=(.)\1)')
+
+
+class PlayfairKey:
+    """A compiled Playfair key: the 5x5 matrix, a 26-letter position index and
+    complete digraph -> digraph tables for both directions.
+
+    Instances are immutable after construction; obtain them through
+    `PlayfairCipher.compile` so repeated keys are served from a cache.
+    """
+
+    def __init__(self, key):
         matrix_chars = []
         for char in key:
-            if char not in matrix_chars and char in alphabet:
+            if char not in matrix_chars and char in ALPHABET:
                 matrix_chars.append(char)
-        for char in alphabet:
+        for char in ALPHABET:
             if char not in matrix_chars:
                 matrix_chars.append(char)
-        
-        matrix = [matrix_chars[i:i+5] for i in range(0, 25, 5)]
-        self._add_step("Playfair Matrix (5x5):")
-        for row in matrix:
-            self._add_step("  " + " ".join(row))
-        return matrix, matrix_chars
 
-    def _get_pos(self, char, matrix):
-        for r, row in enumerate(matrix):
-            if char in row:
-                return r, row.index(char)
-        return None
+        self.matrix_chars = tuple(matrix_chars)
+        self.matrix = tuple(tuple(matrix_chars[i:i+5]) for i in range(0, 25, 5))
+        self.positions = {char: divmod(i, 5) for i, char in enumerate(matrix_chars)}
+        self.positions['J'] = self.positions['I']
+        # Digraph -> (result, rule, coords) for all 625 ordered letter pairs
+        self.encrypt_rules = self._build_rules(1)
+        self.decrypt_rules = self._build_rules(-1)
+        # Digraph -> result only, for bulk translation
+        self.encrypt_table = {pair: rule[0] for pair, rule in self.encrypt_rules.items()}
+        self.decrypt_table = {pair: rule[0] for pair, rule in self.decrypt_rules.items()}
 
-    def _prepare_text(self, text):
-        text = self._sanitize_text(text).replace('J', 'I')
-        res = []
-        i = 0
-        while i < len(text):
-            c1 = text[i]
-            if i + 1 < len(text):
-                c2 = text[i+1]
-                if c1 == c2:
-                    res.append(c1 + 'X')
-                    i += 1
+    def _build_rules(self, direction):
+        matrix = self.matrix
+        rules = {}
+        letters = [(char, self.positions[char]) for char in self.matrix_chars]
+        for a, (r1, c1) in letters:
+            for b, (r2, c2) in letters:
+                if r1 == r2:
+                    # Same row
+                    n1_col, n2_col = (c1 + direction) % 5, (c2 + direction) % 5
+                    n1, n2 = matrix[r1][n1_col], matrix[r2][n2_col]
+                    rule = "Same Row"
+                    coords = ((r1, c1), (r2, c2), (r1, n1_col), (r2, n2_col))
+                elif c1 == c2:
+                    # Same column
+                    n1_row, n2_row = (r1 + direction) % 5, (r2 + direction) % 5
+                    n1, n2 = matrix[n1_row][c1], matrix[n2_row][c2]
+                    rule = "Same Column"
+                    coords = ((r1, c1), (r2, c2), (n1_row, c1), (n2_row, c2))
                 else:
-                    res.append(c1 + c2)
-                    i += 2
-            else:
-                res.append(c1 + 'X')
-                i += 1
-        return res
+                    # Rectangle
+                    n1, n2 = matrix[r1][c2], matrix[r2][c1]
+                    rule = "Rectangle"
+                    coords = ((r1, c1), (r2, c2), (r1, c2), (r2, c1)) # (orig1, orig2, new1, new2)
+                rules[a + b] = (n1 + n2, rule, coords)
+        return rules
 
-    def encrypt(self, plaintext, key):
-        self._clear_steps()
+
+def normalize_letters(text):
+    """Keeps only the letters A-Z of `text`, uppercased, with J folded into I.
+
+    Bytes-like input is treated as ASCII; the result is always a str.
+    """
+    if not isinstance(text, str):
+        letters = bytes(text).translate(None, _BYTES_NON_LETTERS).decode('ascii').upper()
+    elif text.isascii():
+        letters = _NON_LETTERS.sub('', text).upper()
+    else:
+        letters = _NON_MATRIX_LETTERS.sub('', "".join(filter(str.isalpha, text)).upper())
+    return letters.replace('J', 'I')
+
+
+def pad_digraphs(letters):
+    """Inserts the filler 'X' after a letter doubled within a digraph and after a trailing lone letter."""
+    padded, leftover = _split_digraphs(letters)
+    return padded + leftover + 'X' if leftover else padded
+
+
+def _split_digraphs(letters):
+    """Pads `letters` into complete digraphs, holding back a trailing lone letter.
+
+    Returns `(padded, leftover)`, where `leftover` is '' or the lone last
+    letter, so that a following chunk can complete its digraph. Only the
+    (usually rare) doubled letters are visited in Python; the digraph
+    boundaries between them follow from their parity.
+    """
+    pos = 0
+    parts = []
+    for match in _DOUBLED.finditer(letters):
+        d = match.start()
+        if d >= pos and (d - pos) % 2 == 0:
+            parts.append(letters[pos:d+1])
+            parts.append('X')
+            pos = d + 1
+    if (len(letters) - pos) % 2:
+        parts.append(letters[pos:-1])
+        return "".join(parts), letters[-1]
+    parts.append(letters[pos:])
+    return "".join(parts), ''
+
+
+
+def align_to_digraphs(letters, cuts):
+    """Moves each of the ascending `cuts` forward to the nearest digraph start in `letters`.
+
+    Digraph starts are those of `pad_digraphs(letters)`, so the padded pieces
+    `letters[a:b]` between aligned cuts concatenate to the padded whole.
+    """
+    doubled = (match.start() for match in _DOUBLED.finditer(letters))
+    d = next(doubled, None)
+    pos = 0
+    aligned = []
+    for cut in cuts:
+        # Replay the filler insertions that move the digraph grid before `cut`
+        while d is not None and d < cut:
+            if d >= pos and (d - pos) % 2 == 0:
+                pos = d + 1
+            d = next(doubled, None)
+        aligned.append(cut if (cut - pos) % 2 == 0 else cut + 1)
+    return aligned
+
+
+class PlayfairCipher(Cipher):
+    key_type = PlayfairKey
+
+    def _prepare_text(self, text):
+        return _PAIRS.findall(pad_digraphs(normalize_letters(text)))
+
+    def _normalize_key(self, key):
+        # Cached by its letters, so e.g. "Playfair" and "PLAY FAIR" share one matrix
+        if not isinstance(key, (str, bytes, bytearray, memoryview)):
+            raise TypeError(f"Key for Playfair Cipher must be a string, not {type(key).__name__}.")
         if not key:
             raise ValueError("Key for Playfair Cipher cannot be empty.")
-        
-        matrix, matrix_list = self._create_matrix(key)
-        pairs = self._prepare_text(plaintext)
-        
-        result = []
-        detailed_steps = []
-        
-        for pair in pairs:
-            r1, c1 = self._get_pos(pair[0], matrix)
-            r2, c2 = self._get_pos(pair[1], matrix)
-            
-            if r1 == r2:
-                # Same row
-                n1_col, n2_col = (c1 + 1) % 5, (c2 + 1) % 5
-                n1, n2 = matrix[r1][n1_col], matrix[r2][n2_col]
-                rule = "Same Row"
-                coords = [(r1, c1), (r2, c2), (r1, n1_col), (r2, n2_col)]
-            elif c1 == c2:
-                # Same column
-                n1_row, n2_row = (r1 + 1) % 5, (r2 + 1) % 5
-                n1, n2 = matrix[n1_row][c1], matrix[n2_row][c2]
-                rule = "Same Column"
-                coords = [(r1, c1), (r2, c2), (n1_row, c1), (n2_row, c2)]
-            else:
-                # Rectangle
-                n1, n2 = matrix[r1][c2], matrix[r2][c1]
-                rule = "Rectangle"
-                coords = [(r1, c1), (r2, c2), (r1, c2), (r2, c1)]
-            
-            result.append(n1 + n2)
-            step_desc = f"{pair} -> {n1}{n2} ({rule})"
-            self._add_step(step_desc)
-            detailed_steps.append({
-                "pair": pair,
-                "result": n1 + n2,
-                "rule": rule,
-                "coords": coords # [(orig1), (orig2), (new1), (new2)]
-            })
+        return normalize_letters(key)
+
+    def _compile_key(self, letters):
+        return PlayfairKey(letters)
 
-        self._animation_data = {
-            "matrix": matrix,
-            "steps": detailed_steps
-        }
-        return "".join(result)
+    def _cipher_pairs(self, ciphertext):
+        letters = normalize_letters(ciphertext)
+        if len(letters) % 2 != 0:
+            raise ValueError("Ciphertext for Playfair must have even length.")
+        return _PAIRS.findall(letters)
+
+    def encrypt(self, plaintext, key):
+        return self._translate_text(plaintext, key, "encrypt")[0]
 
     def decrypt(self, ciphertext, key):
-        self._clear_steps()
-        if not key:
-            raise ValueError("Key for Playfair Cipher cannot be empty.")
-        
-        matrix, _ = self._create_matrix(key)
-        ciphertext = self._sanitize_text(ciphertext)
-        if len(ciphertext) % 2 != 0:
+        return self._translate_text(ciphertext, key, "decrypt")[0]
+
+    def encrypt_traced(self, plaintext, key):
+        result, pairs, compiled, run = self._translate_text(plaintext, key, "encrypt")
+        return self._traced(result, pairs, compiled, compiled.encrypt_rules, run)
+
+    def decrypt_traced(self, ciphertext, key):
+        result, pairs, compiled, run = self._translate_text(ciphertext, key, "decrypt")
+        return self._traced(result, pairs, compiled, compiled.decrypt_rules, run)
+
+    def _translate_text(self, text, key, mode):
+        """Returns `(result, digraphs, compiled key, metrics run)`."""
+        run = metrics.start(self, mode)
+        compiled = self.compile(key)
+        run.lap("key")
+        if mode == "decrypt":
+            pairs, table = self._cipher_pairs(text), compiled.decrypt_table
+        else:
+            pairs, table = self._prepare_text(text), compiled.encrypt_table
+        run.lap("prepare", len(text))
+        result = self._same_type("".join(map(table.__getitem__, pairs)), text)
+        run.lap("substitute")
+        return result, pairs, compiled, run
+
+    def _traced(self, result, pairs, compiled, rules, run):
+        return self._result(result,
+                            run.steps(lambda: self._format_steps(pairs, compiled.matrix, rules)),
+                            lambda: {
+                                "matrix": compiled.matrix,
+                                "steps": list(self._iter_pair_details(pairs, rules))
+                            })
+
+    def _batch_arrays(self, batch, messages, keys, decrypt):
+        # Padding and digraph splitting depend only on the message, so they run once per message
+        if decrypt:
+            texts = ["".join(self._cipher_pairs(message)) for message in messages]
+        else:
+            texts = [pad_digraphs(normalize_letters(message)) for message in messages]
+        return batch.playfair_batch(texts, keys, decrypt)
+
+    def _same_type(self, result, source):
+        return result if isinstance(source, str) else result.encode('ascii')
+
+    def output_size(self, src, decrypt=False):
+        letters = normalize_letters(src)
+        if decrypt:
+            return len(letters)
+        padded, leftover = _split_digraphs(letters)
+        return len(padded) + (2 if leftover else 0)
+
+    def max_output_size(self, size, decrypt=False):
+        # Each letter gains at most one filler
+        return size if decrypt else 2 * size
+
+    def encrypt_stream(self, source, key, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Encrypts a file object or iterable of chunks.
+
+        A lone letter at the end of a chunk is carried into the next chunk, so
+        the concatenated output equals `encrypt` on the concatenated input.
+        """
+        run = metrics.start(self, "encrypt")
+        table = self.compile(key).encrypt_table
+        run.lap("key")
+        return self._encrypt_stream(source, table, chunk_size, run)
+
+    def decrypt_stream(self, source, key, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Decrypts a file object or iterable of chunks, carrying an odd trailing letter across chunks."""
+        run = metrics.start(self, "decrypt")
+        table = self.compile(key).decrypt_table
+        run.lap("key")
+        return self._decrypt_stream(source, table, chunk_size, run)
+
+    def _encrypt_stream(self, source, table, chunk_size, run):
+        leftover = ''
+        as_bytes = False
+        for chunk in iter_chunks(source, chunk_size):
+            run.mark()
+            as_bytes = not isinstance(chunk, str)
+            padded, leftover = _split_digraphs(leftover + normalize_letters(chunk))
+            run.lap("prepare", len(chunk))
+            if padded:
+                result = self._translate(padded, table, as_bytes)
+                run.lap("substitute")
+                yield result
+        if leftover:
+            yield self._translate(leftover + 'X', table, as_bytes)
+
+    def _decrypt_stream(self, source, table, chunk_size, run):
+        leftover = ''
+        for chunk in iter_chunks(source, chunk_size):
+            run.mark()
+            letters = leftover + normalize_letters(chunk)
+            cut = len(letters) - len(letters) % 2
+            letters, leftover = letters[:cut], letters[cut:]
+            run.lap("prepare", len(chunk))
+            result = self._translate(letters, table, not isinstance(chunk, str))
+            run.lap("substitute")
+            yield result
+        if leftover:
             raise ValueError("Ciphertext for Playfair must have even length.")
-            
-        pairs = [ciphertext[i:i+2] for i in range(0, len(ciphertext), 2)]
-        
-        result = []
-        detailed_steps = []
-        
+
+    def _translate(self, padded, table, as_bytes):
+        result = "".join(map(table.__getitem__, _PAIRS.findall(padded)))
+        return result.encode('ascii') if as_bytes else result
+
+    def _iter_pair_details(self, pairs, rules):
         for pair in pairs:
-            r1, c1 = self._get_pos(pair[0], matrix)
-            r2, c2 = self._get_pos(pair[1], matrix)
-            
-            if r1 == r2:
-                n1_col, n2_col = (c1 - 1) % 5, (c2 - 1) % 5
-                n1, n2 = matrix[r1][n1_col], matrix[r2][n2_col]
-                rule = "Same Row"
-                coords = [(r1, c1), (r2, c2), (r1, n1_col), (r2, n2_col)]
-            elif c1 == c2:
-                n1_row, n2_row = (r1 - 1) % 5, (r2 - 1) % 5
-                n1, n2 = matrix[n1_row][c1], matrix[n2_row][c2]
-                rule = "Same Column"
-                coords = [(r1, c1), (r2, c2), (n1_row, c1), (n2_row, c2)]
-            else:
-                n1, n2 = matrix[r1][c2], matrix[r2][c1]
-                rule = "Rectangle"
-                coords = [(r1, c1), (r2, c2), (r1, c2), (r2, c1)]
-            
-            result.append(n1 + n2)
-            step_desc = f"{pair} -> {n1}{n2} ({rule})"
-            self._add_step(step_desc)
-            detailed_steps.append({
+            result, rule, coords = rules[pair]
+            yield {
                 "pair": pair,
-                "result": n1 + n2,
+                "result": result,
                 "rule": rule,
-                "coords": coords
-            })
-
-        self._animation_data = {
-            "matrix": matrix,
-            "steps": detailed_steps
-        }
-        return "".join(result)
+                "coords": list(coords)
+            }
+
+    def _format_steps(self, pairs, matrix, rules):
+        yield "Playfair Matrix (5x5):"
+        for row in matrix:
+            yield "  " + " ".join(row)
+        for pair in pairs:
+            result, rule, _ = rules[pair]
+            yield f"{pair} -> {result} ({rule})"
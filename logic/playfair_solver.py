@@ -0,0 +1,270 @@
+"""Ciphertext-only Playfair key recovery by simulated annealing.
+
+Candidate key squares are mutated and scored by the n-gram fitness of their
+trial decryption. A trial decryption never searches the matrix: the
+ciphertext is reduced once to its distinct digraphs, and for each candidate
+square a position index and the decryption of those digraphs are computed
+with a handful of array operations, then expanded back to the full text.
+
+Independent annealing runs (restarts) are spread across worker processes;
+the best result wins. Requires NumPy.
+"""
+import math
+import multiprocessing
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+try:
+    import numpy as np
+except ImportError:  # The solver needs NumPy; the rest of the package does not
+    np = None
+
+from .playfair import ALPHABET, normalize_letters
+
+# Result of solve_playfair: the 25-letter key square (row by row), the
+# decryption under it and its fitness (mean log10 n-gram probability)
+PlayfairSolution = namedtuple("PlayfairSolution", ["key", "plaintext", "fitness"])
+
+# Small built-in training text for the default n-gram model. Pass a larger
+# English corpus to NgramScorer.from_text for better results on short ciphertexts.
+DEFAULT_CORPUS = """
+It was the best of times for the small town by the river. Every morning the
+people would walk down to the market to buy bread, fish and fresh vegetables,
+and they would talk about the weather, the harvest and the news from the city.
+The old bookkeeper who lived above the bakery kept careful records of every
+sale, and the children of the town liked to visit him after school because he
+told stories about the war and about the ships that had once sailed into the
+harbour. There was nothing in the world that he did not seem to know. When the
+winter came the roads were covered with snow and the river froze, so nobody
+could travel to the city for many weeks. Then the people gathered in the great
+hall in the evenings, where they played music, read letters from their friends
+and family, and made plans for the spring. The soldiers who guarded the bridge
+were sent a message that the enemy would attack at dawn, but the message was
+written in a secret code so that no spy could read it if it was captured on the
+way. Only the general and his most trusted officer knew the key. They had
+agreed on it many months before, when they first met in the capital, and they
+had promised never to write it down. The officer read the message slowly,
+letter by letter, and when he understood what it meant he went at once to
+warn the captain of the guard. Together they prepared the defence of the
+bridge through the night, and when the sun rose over the hills the enemy
+found the soldiers waiting for them. The battle was short and the town was
+saved. Many years later the story was still told in the schools, and the
+children learned that a good cipher and a well kept secret can be stronger
+than an army. The history of cryptography is full of such stories, from the
+simple substitution of letters used by the ancient generals to the machines
+of the last century and the mathematics that protects our messages today.
+Each new method was thought to be unbreakable until someone found a weakness,
+usually by counting how often each letter or pair of letters appeared, since
+the patterns of a language are very hard to hide completely.
+"""
+
+
+class NgramScorer:
+    """Log10 n-gram probabilities over the 25-letter Playfair alphabet (J folded into I)."""
+
+    def __init__(self, log_probs, n):
+        self.log_probs = log_probs
+        self.n = n
+
+    @classmethod
+    def from_text(cls, corpus, n=3):
+        """Builds the model from English `corpus` text; unseen n-grams get a floor probability."""
+        _require_numpy()
+        letters = _alphabet_indices(corpus)
+        if letters.size < n:
+            raise ValueError("Corpus is too short for the n-gram size.")
+        counts = np.bincount(_ngram_codes(letters, n), minlength=25 ** n).astype(np.float64)
+        total = counts.sum()
+        log_probs = np.where(counts > 0, np.log10(np.maximum(counts, 1) / total), math.log10(0.01 / total))
+        return cls(log_probs, n)
+
+    def fitness(self, letters):
+        """Mean log10 probability of the n-grams of an alphabet index array."""
+        return float(self.log_probs[_ngram_codes(letters, self.n)].mean())
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The Playfair solver requires NumPy.")
+
+
+def _alphabet_indices(text):
+    """The Playfair letters of `text` as indices into ALPHABET."""
+    lookup = np.zeros(256, dtype=np.int64)
+    lookup[np.frombuffer(ALPHABET.encode('ascii'), dtype=np.uint8)] = np.arange(25)
+    return lookup[np.frombuffer(normalize_letters(text).encode('ascii'), dtype=np.uint8)]
+
+
+def _ngram_codes(letters, n):
+    codes = np.zeros(letters.size - n + 1, dtype=np.int64)
+    for i in range(n):
+        codes = codes * 25 + letters[i:letters.size - n + 1 + i]
+    return codes
+
+
+_PREV = np.array([4, 0, 1, 2, 3]) if np is not None else None
+
+
+class TrialDecryptor:
+    """Decrypts one fixed ciphertext under many candidate key squares."""
+
+    def __init__(self, ciphertext):
+        _require_numpy()
+        letters = _alphabet_indices(ciphertext)
+        if letters.size < 2 or letters.size % 2:
+            raise ValueError("Ciphertext for Playfair must have an even number of letters.")
+        codes = letters[0::2] * 25 + letters[1::2]
+        # Each distinct digraph is decrypted once per candidate
+        unique, self.inverse = np.unique(codes, return_inverse=True)
+        self.first, self.second = unique // 25, unique % 25
+        self.plain = np.empty(letters.size, dtype=np.int64)
+
+    def decrypt(self, square):
+        """Plaintext alphabet indices under `square` (25 letter indices, row by row)."""
+        position = np.empty(25, dtype=np.int64)
+        position[square] = np.arange(25)
+        p1, p2 = position[self.first], position[self.second]
+        r1, c1 = p1 // 5, p1 % 5
+        r2, c2 = p2 // 5, p2 % 5
+        same_row = r1 == r2
+        same_col = (c1 == c2) & ~same_row
+        # Rectangle by default, then the row and column rules (row wins for doubled letters)
+        n1_r, n1_c = r1.copy(), c2.copy()
+        n2_r, n2_c = r2.copy(), c1.copy()
+        n1_c[same_row], n2_c[same_row] = _PREV[c1[same_row]], _PREV[c2[same_row]]
+        n1_r[same_col], n2_r[same_col] = _PREV[r1[same_col]], _PREV[r2[same_col]]
+        n1_c[same_col], n2_c[same_col] = c1[same_col], c2[same_col]
+        self.plain[0::2] = square[n1_r * 5 + n1_c][self.inverse]
+        self.plain[1::2] = square[n2_r * 5 + n2_c][self.inverse]
+        return self.plain
+
+
+def _mutate(square, rng):
+    child = square.copy()
+    roll = rng.random()
+    if roll < 0.9:
+        i, j = rng.sample(range(25), 2)
+        child[i], child[j] = child[j], child[i]
+        return child
+    grid = child.reshape(5, 5)
+    if roll < 0.94:
+        i, j = rng.sample(range(5), 2)
+        grid[[i, j]] = grid[[j, i]]
+    elif roll < 0.98:
+        i, j = rng.sample(range(5), 2)
+        grid[:, [i, j]] = grid[:, [j, i]]
+    else:
+        grid[:] = grid[::-1, ::-1]
+    return child
+
+
+def anneal(decryptor, scorer, iterations, rng, start_temperature=0.05, threshold=None, should_stop=None):
+    """One simulated annealing run from a random square; returns (best_square, best_fitness).
+
+    The temperature falls linearly from `start_temperature` (in units of mean
+    log10 n-gram probability) to zero. The run ends early once `threshold`
+    is reached or `should_stop()` returns true (polled every 1024 steps).
+    """
+    square = np.array(rng.sample(range(25), 25), dtype=np.int64)
+    fitness = scorer.fitness(decryptor.decrypt(square))
+    best_square, best_fitness = square, fitness
+    for step in range(iterations):
+        if should_stop is not None and step % 1024 == 0 and should_stop():
+            break
+        temperature = start_temperature * (1 - step / iterations) + 1e-9
+        child = _mutate(square, rng)
+        child_fitness = scorer.fitness(decryptor.decrypt(child))
+        delta = child_fitness - fitness
+        if delta >= 0 or rng.random() < math.exp(delta / temperature):
+            square, fitness = child, child_fitness
+            if fitness > best_fitness:
+                best_square, best_fitness = square, fitness
+                if threshold is not None and best_fitness >= threshold:
+                    break
+    return best_square, best_fitness
+
+
+# Per-process state for pool workers, set once by the initializer
+_worker_state = {}
+
+
+def _init_worker(ciphertext, scorer, stop_event=None):
+    _worker_state["decryptor"] = TrialDecryptor(ciphertext)
+    _worker_state["scorer"] = scorer
+    _worker_state["stop"] = stop_event.is_set if stop_event is not None else None
+
+
+def _run_restart(seed, iterations, start_temperature, threshold):
+    square, fitness = anneal(_worker_state["decryptor"], _worker_state["scorer"], iterations,
+                             random.Random(seed), start_temperature, threshold, _worker_state["stop"])
+    return square.tolist(), fitness
+
+
+def solve_playfair(ciphertext, restarts=8, iterations=60000, workers=None, scorer=None,
+                   threshold=None, progress=None, seed=None, start_temperature=0.05):
+    """Searches for the Playfair key square of `ciphertext` alone.
+
+    Runs `restarts` independent annealing runs of `iterations` mutations each
+    on up to `workers` processes (default: all CPUs). `progress`, if given,
+    is called as `progress(done, restarts, best_fitness)` after every run.
+    Once a run reaches `threshold` fitness the other runs are stopped.
+    Returns a `PlayfairSolution`.
+    """
+    _require_numpy()
+    if restarts < 1:
+        raise ValueError("restarts must be positive.")
+    if iterations < 1:
+        raise ValueError("iterations must be positive.")
+    scorer = scorer or default_scorer()
+    decryptor = TrialDecryptor(ciphertext)
+    seeds = [(seed if seed is not None else random.randrange(1 << 30)) + i for i in range(restarts)]
+    workers = max(1, min(workers or os.cpu_count() or 1, restarts))
+
+    best = (None, -math.inf)
+    done = 0
+
+    def record(result):
+        nonlocal best, done
+        done += 1
+        if result[1] > best[1]:
+            best = result
+        if progress is not None:
+            progress(done, restarts, best[1])
+        return threshold is not None and best[1] >= threshold
+
+    if workers == 1:
+        _init_worker(ciphertext, scorer)
+        for s in seeds:
+            if record(_run_restart(s, iterations, start_temperature, threshold)):
+                break
+    else:
+        stop_event = multiprocessing.Event()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(ciphertext, scorer, stop_event)) as pool:
+            pending = {pool.submit(_run_restart, s, iterations, start_temperature, threshold) for s in seeds}
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                if any([record(f.result()) for f in finished]):
+                    # Cancel queued runs and make the running ones return early
+                    stop_event.set()
+                    for f in pending:
+                        f.cancel()
+                    break
+
+    square = np.array(best[0], dtype=np.int64)
+    key = "".join(ALPHABET[i] for i in square)
+    plaintext = "".join(ALPHABET[i] for i in decryptor.decrypt(square))
+    return PlayfairSolution(key, plaintext, best[1])
+
+
+_default_scorer = None
+
+
+def default_scorer():
+    """The trigram scorer trained on DEFAULT_CORPUS, built on first use."""
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = NgramScorer.from_text(DEFAULT_CORPUS, 3)
+    return _default_scorer
@@ -0,0 +1,358 @@
+"""Asyncio encryption service and client over a local TCP or Unix socket.
+
+Protocol: every message is a frame of a 4-byte big-endian length followed by
+that many bytes of UTF-8 JSON. Requests are
+
+    {"id": 1, "op": "encrypt" | "decrypt", "cipher": "vigenere", "key": "LEMON", "text": "..."}
+
+and each gets one response, possibly out of order when pipelined:
+
+    {"id": 1, "ok": true, "text": "..."}  or  {"id": 1, "ok": false, "error": "..."}
+
+Requests arriving within `window` seconds of each other are grouped by
+(cipher, op, key); each group compiles its key once and runs as one batch,
+inline for small batches and in a worker pool for large ones. A connection
+stops being read while it has `max_inflight` unanswered requests or its
+responses are not being consumed, so slow clients cannot grow the queues.
+
+    python -m logic.service --tcp 127.0.0.1:8765
+    python -m logic.service --unix /tmp/cipher.sock
+"""
+import argparse
+import asyncio
+import json
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from . import CIPHERS, get_cipher
+
+_LENGTH = struct.Struct("!I")
+DEFAULT_MAX_FRAME = 16 << 20
+
+
+def encode_frame(message):
+    payload = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    return _LENGTH.pack(len(payload)) + payload
+
+
+async def read_frame(reader, max_frame=DEFAULT_MAX_FRAME):
+    """Reads one frame; returns the decoded message, or None at a clean end of stream."""
+    try:
+        header = await reader.readexactly(_LENGTH.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise ConnectionError("Connection closed inside a frame header.")
+        return None
+    (size,) = _LENGTH.unpack(header)
+    if size > max_frame:
+        raise ValueError(f"Frame of {size} bytes exceeds the {max_frame} byte limit.")
+    return json.loads(await reader.readexactly(size))
+
+
+def run_batch(cipher_name, decrypt, key, texts):
+    """Encrypts or decrypts `texts` under one key; returns `(ok, text_or_error)` per text."""
+    cipher = get_cipher(cipher_name)()
+    try:
+        key = cipher.compile(key)
+    except (TypeError, ValueError) as e:
+        return [(False, str(e))] * len(texts)
+    transform = cipher.decrypt if decrypt else cipher.encrypt
+    if cipher_name == "caesar" and len(texts) > 1:
+        # Caesar maps character by character: one translate call for the whole batch
+        joined = transform("".join(texts), key)
+        results = []
+        pos = 0
+        for text in texts:
+            results.append((True, joined[pos:pos + len(text)]))
+            pos += len(text)
+        return results
+    results = []
+    for text in texts:
+        try:
+            results.append((True, transform(text, key)))
+        except ValueError as e:
+            results.append((False, str(e)))
+    return results
+
+
+class CipherServer:
+    """Batching encryption server; see the module docstring for the protocol.
+
+    `window` is how long (seconds) a new group waits for more requests;
+    a group is also flushed once it holds `max_batch` requests. Batches of at
+    most `inline_limit` characters run on the event loop, larger ones in a
+    pool of `workers` processes (`pool="process"`) or threads.
+    """
+
+    def __init__(self, window=0.002, max_batch=256, max_inflight=1024, inline_limit=1 << 16,
+                 workers=None, pool="process", max_frame=DEFAULT_MAX_FRAME):
+        if pool not in ("process", "thread"):
+            raise ValueError("pool must be 'process' or 'thread'.")
+        self.window = window
+        self.max_batch = max_batch
+        self.max_inflight = max_inflight
+        self.inline_limit = inline_limit
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = pool
+        self.max_frame = max_frame
+        self.stats = {"requests": 0, "batches": 0, "pooled_batches": 0}
+        self._executor = None
+        self._groups = {}
+        self._server = None
+        self._connections = set()
+
+    async def start_tcp(self, host="127.0.0.1", port=0):
+        """Starts listening; returns the bound (host, port)."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start_unix(self, path):
+        self._server = await asyncio.start_unix_server(self._handle, path)
+        return path
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        for batch, timer in self._groups.values():
+            timer.cancel()
+            for _, future in batch:
+                future.cancel()
+        self._groups.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        slots = asyncio.Semaphore(self.max_inflight)
+        pending = set()
+
+        def respond(request_id, future):
+            pending.discard(future)
+            slots.release()
+            if future.cancelled() or writer.is_closing():
+                return
+            ok, value = future.result()
+            message = {"id": request_id, "ok": ok, "text" if ok else "error": value}
+            writer.write(encode_frame(message))
+
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    request = await read_frame(reader, self.max_frame)
+                except (ValueError, ConnectionError) as e:
+                    # Framing is lost; report and drop the connection
+                    writer.write(encode_frame({"id": None, "ok": False, "error": str(e)}))
+                    break
+                if request is None:
+                    break
+                future = self._submit(request)
+                pending.add(future)
+                request_id = request.get("id") if isinstance(request, dict) else None
+                future.add_done_callback(lambda f, rid=request_id: respond(rid, f))
+                # Stop reading while the client is not consuming its responses
+                await writer.drain()
+            if pending:
+                await asyncio.wait(pending)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # Server shutdown; the connection is closed below
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    def _submit(self, request):
+        """Queues one request in its (cipher, op, key) group; returns a future of `(ok, value)`."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.stats["requests"] += 1
+        error = self._validate(request)
+        if error:
+            future.set_result((False, error))
+            return future
+        group = (request["cipher"].lower(), request["op"] == "decrypt", request["key"])
+        entry = self._groups.get(group)
+        if entry is None:
+            entry = self._groups[group] = ([], loop.call_later(self.window, self._flush, group))
+        entry[0].append((request["text"], future))
+        if len(entry[0]) >= self.max_batch:
+            self._flush(group)
+        return future
+
+    def _validate(self, request):
+        if not isinstance(request, dict):
+            return "Request must be a JSON object."
+        if request.get("op") not in ("encrypt", "decrypt"):
+            return "op must be 'encrypt' or 'decrypt'."
+        cipher = request.get("cipher")
+        if not isinstance(cipher, str) or cipher.lower() not in CIPHERS:
+            return f"Unknown cipher {cipher!r}; expected one of {', '.join(CIPHERS)}."
+        key = request.get("key")
+        if cipher.lower() == "caesar":
+            if not isinstance(key, (str, int)) or isinstance(key, bool):
+                return "key must be a string or an integer."
+        elif not isinstance(key, str):
+            return "key must be a string."
+        if not isinstance(request.get("text"), str):
+            return "text must be a string."
+        return None
+
+    def _flush(self, group):
+        batch, timer = self._groups.pop(group)
+        timer.cancel()
+        futures = [future for _, future in batch]
+        texts = [text for text, _ in batch]
+        self.stats["batches"] += 1
+        if sum(map(len, texts)) <= self.inline_limit:
+            try:
+                results = run_batch(*group, texts)
+            except Exception as e:
+                # Runs in a loop callback: every future must still be resolved
+                results = [(False, f"Batch failed: {e}")] * len(texts)
+            self._deliver(futures, results)
+            return
+        self.stats["pooled_batches"] += 1
+        done = asyncio.get_running_loop().run_in_executor(self._get_executor(), run_batch, *group, texts)
+        done.add_done_callback(lambda f: self._deliver(futures, self._batch_result(f, len(texts))))
+
+    def _batch_result(self, done, count):
+        if done.cancelled():
+            return [(False, "Server shutting down.")] * count
+        if done.exception() is not None:
+            return [(False, f"Worker failed: {done.exception()}")] * count
+        return done.result()
+
+    def _deliver(self, futures, results):
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _get_executor(self):
+        if self._executor is None:
+            pool_cls = ProcessPoolExecutor if self.pool == "process" else ThreadPoolExecutor
+            self._executor = pool_cls(max_workers=self.workers)
+        return self._executor
+
+
+class CipherClient:
+    """Pipelining client for `CipherServer`; many requests may be awaited concurrently."""
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._pending = {}
+        self._next_id = 0
+        self._responses = asyncio.ensure_future(self._read_responses())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=None, path=None):
+        """Connects over TCP (`host`, `port`) or to the Unix socket at `path`."""
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def encrypt(self, cipher, text, key):
+        return await self.request("encrypt", cipher, text, key)
+
+    async def decrypt(self, cipher, text, key):
+        return await self.request("decrypt", cipher, text, key)
+
+    async def request(self, op, cipher, text, key):
+        """Sends one request and returns the result text; server-side errors raise ValueError."""
+        if self._responses.done():
+            raise ConnectionError("Connection to the cipher service is closed.")
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(encode_frame({"id": request_id, "op": op, "cipher": cipher, "key": key, "text": text}))
+        await self._writer.drain()
+        ok, value = await future
+        if not ok:
+            raise ValueError(value)
+        return value
+
+    async def _read_responses(self):
+        error = ConnectionError("Connection to the cipher service was closed.")
+        try:
+            while True:
+                message = await read_frame(self._reader)
+                if message is None:
+                    break
+                future = self._pending.pop(message.get("id"), None)
+                if future is None:
+                    error = ConnectionError(message.get("error", "Unexpected response."))
+                    break
+                if not future.done():
+                    future.set_result((message["ok"], message.get("text" if message["ok"] else "error")))
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError) as e:
+            error = ConnectionError(str(e))
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self._responses
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m logic.service", description="Run the batching cipher service.")
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--tcp", metavar="HOST:PORT", help="listen on a TCP address")
+    where.add_argument("--unix", metavar="PATH", help="listen on a Unix socket")
+    parser.add_argument("--window-ms", type=float, default=2.0, help="batching window (default: 2 ms)")
+    parser.add_argument("--max-batch", type=int, default=256, help="flush a group at this many requests")
+    parser.add_argument("--max-inflight", type=int, default=1024, help="unanswered requests per connection")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    args = parser.parse_args(argv)
+
+    async def serve():
+        server = CipherServer(args.window_ms / 1000, args.max_batch, args.max_inflight, workers=args.workers)
+        if args.unix:
+            address = await server.start_unix(args.unix)
+        else:
+            host, _, port = args.tcp.rpartition(":")
+            address = await server.start_tcp(host or "127.0.0.1", int(port))
+        print(f"Cipher service listening on {address}", file=sys.stderr)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
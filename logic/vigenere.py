@@ -1,44 +1,264 @@
-from .cipher_base import Cipher
+from collections import namedtuple
+
+from . import metrics
+from .analysis import estimate_key_length, letter_indices, solve_columns
+from .caesar import LETTERS
+from .cipher_base import Cipher, DEFAULT_CHUNK_SIZE, byte_view, iter_chunks
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python engine is used instead
+    np = None
+
+
+def key_shifts(key):
+    """Per-letter shift amounts (0-25) of a Vigenère key."""
+    return [(ord(k.upper()) - ord('A')) % 26 for k in key]
+
+
+_BYTES_NON_LETTERS = bytes(c for c in range(256) if not (65 <= c <= 90 or 97 <= c <= 122))
+
+
+def count_letters(text):
+    """Number of ASCII letters in `text` (str or bytes-like), i.e. how far it advances the key."""
+    if isinstance(text, str):
+        if not text.isascii():
+            return sum(map(text.count, LETTERS))
+        text = text.encode('ascii')
+    return len(bytes(text).translate(None, _BYTES_NON_LETTERS))
+
+
+def vigenere_shift(text, shifts, phase=0):
+    """Shifts the ASCII letters of `text` by the repeating `shifts`, starting at key index `phase`.
+
+    Non-letters are copied unchanged and do not advance the key. `text` may
+    be a str or a bytes-like object; the result has the same type
+    (bytearray/memoryview input returns bytes).
+    """
+    return _shift(text, shifts, phase)[0]
+
+
+def _shift(text, shifts, phase):
+    """Like `vigenere_shift`, but returns `(result, phase after the last letter)`."""
+    if np is not None:
+        return _shift_numpy(text, shifts, phase)
+    return _shift_python(text, shifts, phase)
+
+
+# Letters are shifted in cache-sized blocks; whole-array temporaries are
+# several times slower on multi-megabyte inputs.
+_BLOCK_SIZE = 1 << 16
+# Adds a byte value to all eight byte lanes of a uint64 (or sums the lanes up to each one)
+_LANES = 0x0101010101010101
+# Longest key whose positions fit a byte lane next to an 8-letter count
+_MAX_LANE_KEY = 255 - 8
+
+
+def _shift_array_inplace(arr, shifts, phase):
+    """Vectorized core: shifts the letters of the code point array `arr` in place.
+
+    Returns the key phase after the last letter.
+
+    The key position of every element is its letter count so far: multiplying
+    the letter mask, read as uint64 words, by 0x0101...01 sums it within each
+    word, and a cumsum over the (8 times fewer) word totals adds the count
+    before the word. One `bytes.translate` then maps positions to shifts, so
+    no letters are gathered out of the block or scattered back.
+    """
+    k_len = len(shifts)
+    if k_len > _MAX_LANE_KEY:
+        return _shift_array_masked(arr, shifts, phase)
+    # table[1 + i] is the shift of key position i; a letter's in-word count includes itself
+    table = bytes(shifts[(i - 1) % k_len] for i in range(k_len + 9)).ljust(256, b"\0")
+    lanes = np.uint64(_LANES)
+    mask = np.zeros(_BLOCK_SIZE, dtype=np.uint8)
+    words = mask.view(np.uint64)
+    scratch = np.empty(min(arr.size, _BLOCK_SIZE), dtype=arr.dtype)
+    for start in range(0, arr.size, _BLOCK_SIZE):
+        block = arr[start:start + _BLOCK_SIZE]
+        n = block.size
+        letters = mask[:n]
+        # (c | 32) folds upper case onto lower case; wrap-around keeps the rest >= 26
+        np.less((block | 32) - ord('a'), 26, out=letters.view(bool))
+        if n < _BLOCK_SIZE:
+            mask[n:] = 0
+        counts = words * lanes
+        totals = counts >> np.uint64(56)
+        ends = np.cumsum(totals)
+        counts += ((ends - totals + np.uint64(phase)) % np.uint64(k_len)) * lanes
+        block_shifts = np.frombuffer(counts.view(np.uint8)[:n].tobytes().translate(table), dtype=np.uint8)
+        # 'Z' + 32 == 'z', so the wrap limit follows the case bit
+        wrap = scratch[:n]
+        np.bitwise_and(block, 32, out=wrap)
+        wrap += ord('Z')
+        block += block_shifts * letters
+        np.greater(block, wrap, out=wrap)
+        wrap *= letters
+        wrap *= 26
+        block -= wrap
+        phase += int(ends[-1])
+    return phase
+
+
+def _shift_array_masked(arr, shifts, phase):
+    """`_shift_array_inplace` for keys too long for a byte lane: gathers each block's letters."""
+    k_len = len(shifts)
+    tiled = np.tile(np.asarray(shifts, dtype=arr.dtype), min(arr.size, _BLOCK_SIZE) // k_len + 2)
+    for start in range(0, arr.size, _BLOCK_SIZE):
+        block = arr[start:start + _BLOCK_SIZE]
+        letters = ((block | 32) - ord('a')) < 26
+        vals = block[letters]
+        p = phase % k_len
+        shifted = vals + tiled[p:p + vals.size]
+        shifted -= 26 * (shifted > ord('Z') + (vals & 32)).view(np.uint8)
+        block[letters] = shifted
+        phase += vals.size
+    return phase
+
+
+def _shift_numpy(text, shifts, phase):
+    # Shifted in a bytearray copy, so the result takes a single copy out of it
+    if not isinstance(text, str):
+        buf = bytearray(text)
+        phase = _shift_array_inplace(np.frombuffer(buf, dtype=np.uint8), shifts, phase)
+        return bytes(buf), phase
+    if text.isascii():
+        buf = bytearray(text, 'ascii')
+        phase = _shift_array_inplace(np.frombuffer(buf, dtype=np.uint8), shifts, phase)
+        return buf.decode('ascii'), phase
+    arr = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).copy()
+    phase = _shift_array_inplace(arr, shifts, phase)
+    return arr.tobytes().decode('utf-32-le'), phase
+
+
+def _shift_python(text, shifts, phase):
+    is_str = isinstance(text, str)
+    k_len = len(shifts)
+    k_idx = phase
+    result = []
+    for code in (map(ord, text) if is_str else bytes(text)):
+        if 65 <= code <= 90 or 97 <= code <= 122:
+            base = 97 if code >= 97 else 65
+            code = (code - base + shifts[k_idx % k_len]) % 26 + base
+            k_idx += 1
+        result.append(code)
+    return ("".join(map(chr, result)) if is_str else bytes(result)), k_idx
+
+
+# A compiled Vigenère key: the key text and its encryption and decryption shifts
+VigenereKey = namedtuple("VigenereKey", ["letters", "shifts", "inverse"])
+
+# Result of VigenereCipher.crack: the recovered key, its decryption and the
+# (period, ioc, kasiski) key length ranking
+VigenereCrack = namedtuple("VigenereCrack", ["key", "plaintext", "key_lengths"])
+
 
 class VigenereCipher(Cipher):
+    key_type = VigenereKey
+    preserves_length = True
+
     def encrypt(self, plaintext, key):
-        self._clear_steps()
-        if not key:
-            raise ValueError("Key for Vigenère Cipher cannot be empty.")
+        return self._shift_text(plaintext, key, "encrypt")[0]
 
-        result = []
-        k_idx = 0
-        for char in plaintext:
-            if char.isalpha():
-                k_char = key[k_idx % len(key)]
-                shift = ord(k_char.upper()) - ord('A')
-                base = ord('A') if char.isupper() else ord('a')
-                new_char = chr((ord(char) - base + shift) % 26 + base)
-                result.append(new_char)
-                self._add_step(f"{char} + {k_char} -> {new_char}")
-                k_idx += 1
-            else:
-                result.append(char)
+    def decrypt(self, ciphertext, key):
+        return self._shift_text(ciphertext, key, "decrypt")[0]
 
-        return "".join(result)
+    def encrypt_traced(self, plaintext, key):
+        result, compiled, run = self._shift_text(plaintext, key, "encrypt")
+        return self._result(result, run.steps(lambda: self._format_steps(plaintext, result, compiled.letters, "+")))
 
-    def decrypt(self, ciphertext, key):
-        self._clear_steps()
+    def decrypt_traced(self, ciphertext, key):
+        result, compiled, run = self._shift_text(ciphertext, key, "decrypt")
+        return self._result(result, run.steps(lambda: self._format_steps(ciphertext, result, compiled.letters, "-")))
+
+    def _shift_text(self, text, key, mode):
+        """Returns `(result, compiled key, metrics run)`."""
+        run = metrics.start(self, mode)
+        compiled = self.compile(key)
+        run.lap("key")
+        result = vigenere_shift(text, compiled.inverse if mode == "decrypt" else compiled.shifts)
+        run.lap("substitute", len(text))
+        return result, compiled, run
+
+    def _compile_key(self, key):
         if not key:
             raise ValueError("Key for Vigenère Cipher cannot be empty.")
+        shifts = tuple(key_shifts(key))
+        return VigenereKey(key, shifts, tuple(-s % 26 for s in shifts))
+
+    def encrypt_into(self, src, key, out=None):
+        return self._shift_into(src, self.compile(key).shifts, out)
+
+    def decrypt_into(self, src, key, out=None):
+        return self._shift_into(src, self.compile(key).inverse, out)
+
+    def _shift_into(self, src, shifts, out):
+        src = byte_view(src)
+        size = len(src)
+        dst = self._output_view(src, out, size)
+        if np is not None:
+            arr = np.frombuffer(dst, dtype=np.uint8, count=size)
+            if out is not None:
+                arr[:] = np.frombuffer(src, dtype=np.uint8)
+            _shift_array_inplace(arr, shifts, 0)
+            return size
+        phase = 0
+        for start in range(0, size, DEFAULT_CHUNK_SIZE):
+            end = min(start + DEFAULT_CHUNK_SIZE, size)
+            dst[start:end], phase = _shift_python(src[start:end], shifts, phase)
+        return size
+
+    def _batch_arrays(self, batch, messages, keys, decrypt):
+        return batch.vigenere_batch(messages, [key.inverse if decrypt else key.shifts for key in keys])
+
+    def _transform_window(self, buf, key, decrypt, phase):
+        compiled = self.compile(key)
+        shifts = compiled.inverse if decrypt else compiled.shifts
+        if np is not None:
+            phase = _shift_array_inplace(np.frombuffer(buf, dtype=np.uint8), shifts, phase)
+        else:
+            buf[:], phase = _shift_python(bytes(buf), shifts, phase)
+        return phase % len(shifts)
 
-        result = []
+    def crack(self, ciphertext, max_key_length=40, method="chi2"):
+        """Recovers an unknown key: the key length from the index of coincidence
+        and Kasiski distances, then each key letter as a Caesar problem."""
+        letters = letter_indices(ciphertext)
+        if len(letters) == 0:
+            raise ValueError("Ciphertext contains no letters to analyse.")
+        key_length, ranking = estimate_key_length(letters, max_key_length)
+        shifts = solve_columns(letters, key_length, method)
+        key = "".join(chr(ord('A') + s) for s in shifts)
+        return VigenereCrack(key, vigenere_shift(ciphertext, [-s % 26 for s in shifts]), ranking)
+
+    def encrypt_stream(self, source, key, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Encrypts a file object or iterable of chunks, carrying the key position across chunks."""
+        return self._stream(source, key, "encrypt", chunk_size)
+
+    def decrypt_stream(self, source, key, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Decrypts a file object or iterable of chunks, carrying the key position across chunks."""
+        return self._stream(source, key, "decrypt", chunk_size)
+
+    def _stream(self, source, key, mode, chunk_size):
+        run = metrics.start(self, mode)
+        compiled = self.compile(key)
+        run.lap("key")
+        return self._shift_chunks(source, compiled.inverse if mode == "decrypt" else compiled.shifts, chunk_size, run)
+
+    def _shift_chunks(self, source, shifts, chunk_size, run):
+        phase = 0
+        for chunk in iter_chunks(source, chunk_size):
+            run.mark()
+            result, phase = _shift(chunk, shifts, phase)
+            run.lap("substitute", len(chunk))
+            yield result
+            phase %= len(shifts)
+
+    def _format_steps(self, source, result, key, sign):
+        if not isinstance(source, str):
+            source, result = bytes(source).decode('latin-1'), result.decode('latin-1')
         k_idx = 0
-        for char in ciphertext:
-            if char.isalpha():
-                k_char = key[k_idx % len(key)]
-                shift = ord(k_char.upper()) - ord('A')
-                base = ord('A') if char.isupper() else ord('a')
-                new_char = chr((ord(char) - base - shift) % 26 + base)
-                result.append(new_char)
-                self._add_step(f"{char} - {k_char} -> {new_char}")
+        for char, new_char in zip(source, result):
+            if char in LETTERS:
+                yield f"{char} {sign} {key[k_idx % len(key)]} -> {new_char}"
                 k_idx += 1
-            else:
-                result.append(char)
-
-        return "".join(result)
@@ -1,7 +1,383 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+import queue
+import threading
 import time
-from logic import CaesarCipher, VigenereCipher, PlayfairCipher
+from logic import get_cipher, metrics
+# The ASCII letters the engines shift and count towards the key position
+from logic.caesar import LETTERS
+from logic.playfair import align_to_digraphs, normalize_letters
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class CipherWorker(threading.Thread):
+    """Runs one encryption or decryption off the Tk main thread.
+
+    The text is fed through the cipher's stream API in chunks (or, for an
+    animated Playfair run, traced in chunks), so progress can be reported and
+    a cancel request honoured between chunks. Messages for the
+    GUI are put on `queue`: ("progress", done, total) while running, then one
+    of ("done", result, animation), ("error", message) or ("cancelled",).
+    """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, cipher, mode, text, key, animate=False):
+        super().__init__(daemon=True)
+        self.cipher = cipher
+        self.mode = mode
+        self.text = text
+        self.key = key
+        self.animate = animate
+        self.queue = queue.Queue()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        try:
+            self.queue.put(self._compute())
+        except _Cancelled:
+            self.queue.put(("cancelled",))
+        except Exception as e:
+            self.queue.put(("error", str(e)))
+
+    def _chunks(self):
+        total = len(self.text)
+        for start in range(0, total, self.CHUNK_SIZE):
+            if self._cancel.is_set():
+                raise _Cancelled()
+            end = min(start + self.CHUNK_SIZE, total)
+            yield self.text[start:end]
+            self.queue.put(("progress", end, total))
+
+    def _compute(self):
+        encrypt = self.mode == "Encrypt"
+        if self.animate:
+            return self._compute_traced(encrypt)
+        stream = self.cipher.encrypt_stream if encrypt else self.cipher.decrypt_stream
+        result = "".join(stream(self._chunks(), self.key))
+        if self._cancel.is_set():
+            raise _Cancelled()
+        return ("done", result, None)
+
+    def _compute_traced(self, encrypt):
+        """Playfair with its matrix animation, traced slice by slice in a single pass.
+
+        Playfair output is letters only, so slices of the normalized letters cut
+        at digraph starts give results and steps that concatenate to those of
+        the whole text.
+        """
+        letters = normalize_letters(self.text)
+        total = len(letters)
+        cuts = range(self.CHUNK_SIZE, total, self.CHUNK_SIZE)
+        if encrypt:
+            cuts = align_to_digraphs(letters, cuts)
+        traced = self.cipher.encrypt_traced if encrypt else self.cipher.decrypt_traced
+        results, steps, animation = [], [], None
+        for start, end in zip([0, *cuts], [*cuts, total]):
+            if self._cancel.is_set():
+                raise _Cancelled()
+            piece = traced(letters[start:end], self.key)
+            results.append(piece.text)
+            animation = piece.animation
+            if animation is not None:
+                steps.extend(animation["steps"])
+            self.queue.put(("progress", end, total))
+        if animation is not None:
+            animation["steps"] = steps
+        return ("done", "".join(results), animation)
+
+
+class BufferedTextWriter:
+    """Batches appends to a read-only Text widget into one insert per display frame.
+
+    Appended text is collected in a list and written by a single `after`
+    callback, so a burst of appends costs one insert, one scroll and one
+    state toggle. A placeholder shown by `reset` is replaced by the first
+    write without reading the widget contents back.
+    """
+
+    FRAME_MS = 16
+
+    def __init__(self, root, widget, tags=()):
+        self.root = root
+        self.widget = widget
+        self.tags = tags
+        self._pending = []
+        self._after_id = None
+        self._placeholder = False
+
+    def write(self, text):
+        self._pending.append(text)
+        if self._after_id is None:
+            self._after_id = self.root.after(self.FRAME_MS, self.flush)
+
+    def flush(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending.clear()
+        self.widget.config(state="normal")
+        if self._placeholder:
+            self.widget.delete("1.0", tk.END)
+            self._placeholder = False
+        self.widget.insert(tk.END, text, self.tags)
+        self.widget.see(tk.END)
+        self.widget.config(state="disabled")
+
+    def reset(self, text="", placeholder=False):
+        """Drops pending writes and replaces the contents with `text`."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._pending.clear()
+        self._placeholder = placeholder
+        self.widget.config(state="normal")
+        self.widget.delete("1.0", tk.END)
+        self.widget.insert("1.0", text, self.tags)
+        self.widget.config(state="disabled")
+
+
+class AlignmentViewport:
+    """Scrollable text/key alignment grid that draws only the visible window.
+
+    A fixed number of cell slots is created once and recycled: scrolling or
+    following the animation rewrites the slots for the new window, and
+    moving the current position within the window touches only two slots.
+    The key letter of a position is derived from sparse letter-count
+    checkpoints, so the cost does not depend on the input length.
+    """
+
+    SLOTS = 26
+    CELL_W = 25
+    CHECKPOINT = 1024
+
+    def __init__(self, canvas, text, key, x, y, colors):
+        self.canvas = canvas
+        self.text = text
+        self.key = key.upper()
+        self.colors = colors
+        self.first = 0
+        self.current = -1
+        # Letters before every CHECKPOINT-th position, for the key phase
+        self._checkpoints = [0]
+        for start in range(0, len(text), self.CHECKPOINT):
+            block = text[start:start + self.CHECKPOINT]
+            self._checkpoints.append(self._checkpoints[-1] + sum(map(LETTERS.__contains__, block)))
+
+        self.slots = []
+        for j in range(self.SLOTS):
+            cx = x + j * self.CELL_W
+            r1 = canvas.create_rectangle(cx, y, cx + self.CELL_W, y + 22, outline="#444", fill=colors["matrix_bg"])
+            t1 = canvas.create_text(cx + self.CELL_W/2, y + 11, text="", fill="white", font=("Consolas", 10))
+            r2 = canvas.create_rectangle(cx, y + 25, cx + self.CELL_W, y + 47, outline="#444", fill=colors["matrix_bg"])
+            t2 = canvas.create_text(cx + self.CELL_W/2, y + 36, text="", fill=colors["success"], font=("Consolas", 10, "bold"))
+            self.slots.append((r1, t1, r2, t2))
+
+        self.scrollbar = tk.Scrollbar(canvas, orient="horizontal", command=self.scroll)
+        canvas.create_window(x, y + 52, window=self.scrollbar, anchor="nw", width=self.SLOTS * self.CELL_W)
+        self.render()
+
+    def _phase(self, i):
+        """Number of letters before position `i`."""
+        start = i - i % self.CHECKPOINT
+        return self._checkpoints[i // self.CHECKPOINT] + sum(map(LETTERS.__contains__, self.text[start:i]))
+
+    def key_char(self, i, phase=None):
+        """The key letter aligned with position `i`, or a blank for non-letters."""
+        if self.text[i] not in LETTERS:
+            return " "
+        return self.key[(self._phase(i) if phase is None else phase) % len(self.key)]
+
+    def set_current(self, i):
+        """Moves the highlight to position `i`, scrolling it into view if needed."""
+        previous, self.current = self.current, i
+        if not self.first <= i < self.first + self.SLOTS:
+            self.first = max(0, min(i, len(self.text) - self.SLOTS))
+            self.render()
+            return
+        if abs(i - previous) > 1:
+            # Jumps (seeks, skipped frames) change the key reveal of the slots in between
+            self.render()
+            return
+        if self.first <= previous < self.first + self.SLOTS:
+            self._draw_slot(previous - self.first)
+        self._draw_slot(i - self.first)
+
+    def scroll(self, action, amount, unit=None):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"/"pages")."""
+        if action == "moveto":
+            first = int(float(amount) * len(self.text))
+        else:
+            first = self.first + int(amount) * (self.SLOTS if unit == "pages" else 1)
+        self.first = max(0, min(first, len(self.text) - self.SLOTS))
+        self.render()
+
+    def render(self):
+        # Walk the key phase across the window instead of recounting per slot
+        phase = self._phase(self.first) if self.first < len(self.text) else 0
+        for j in range(self.SLOTS):
+            self._draw_slot(j, phase)
+            i = self.first + j
+            if i < len(self.text) and self.text[i] in LETTERS:
+                phase += 1
+        n = max(len(self.text), 1)
+        self.scrollbar.set(self.first / n, min(self.first + self.SLOTS, n) / n)
+
+    def _draw_slot(self, j, phase=None):
+        r1, t1, r2, t2 = self.slots[j]
+        i = self.first + j
+        if i >= len(self.text):
+            for item in self.slots[j]:
+                self.canvas.itemconfig(item, state="hidden")
+            return
+        char = self.text[i]
+        fill = self.colors["matrix_bg"]
+        key_fill = fill
+        if i == self.current:
+            fill = self.colors["highlight"] if char in LETTERS else self.colors["sidebar"]
+            if char in LETTERS:
+                key_fill = self.colors["highlight"]
+        self.canvas.itemconfig(r1, fill=fill, state="normal")
+        self.canvas.itemconfig(t1, text=char.upper(), state="normal")
+        self.canvas.itemconfig(r2, fill=key_fill, state="normal")
+        # Key letters are revealed as the animation reaches them
+        self.canvas.itemconfig(t2, text=self.key_char(i, phase) if i <= self.current else "", state="normal")
+
+    def destroy(self):
+        self.scrollbar.destroy()
+
+
+class Timeline:
+    """Plays a precomputed list of animation frames from a single `after` clock.
+
+    `render(i, continuous)` draws frame `i` from scratch; `continuous` is
+    true when playback has just advanced from the previous frame and false
+    after a seek, so one-off effects such as log lines are not repeated.
+    `delays[i]` is how long frame `i` stays up in ms, or None for
+    `default_delay()`. Pausing cancels the one pending callback and keeps the
+    time left on the current frame; nothing polls while paused.
+    """
+
+    def __init__(self, root, delays, render, on_finish, default_delay=None, on_position=None):
+        self.root = root
+        self.delays = delays
+        self.render = render
+        self.on_finish = on_finish
+        self.default_delay = default_delay
+        self.on_position = on_position
+        self.position = -1
+        self.playing = False
+        self._after_id = None
+        self._due = 0.0
+        self._remaining = None
+
+    def __len__(self):
+        return len(self.delays)
+
+    def play(self):
+        if self.playing:
+            return
+        self.playing = True
+        if self.position < 0:
+            self._advance()
+        else:
+            self._schedule(self._remaining if self._remaining is not None else self._delay(self.position))
+
+    def pause(self):
+        if not self.playing:
+            return
+        self.playing = False
+        if self._after_id is not None:
+            self._remaining = max(0.0, self._due - time.perf_counter() * 1000)
+            self._cancel()
+
+    def seek(self, i):
+        """Shows frame `i` (clamped); playback, if running, continues from there."""
+        if not self.delays:
+            return
+        self._cancel()
+        self.position = max(0, min(i, len(self.delays) - 1))
+        self._remaining = None
+        self._show(False)
+        if self.playing:
+            self._schedule(self._delay(self.position))
+
+    def step(self, n=1):
+        self.pause()
+        self.seek(self.position + n)
+
+    def stop(self):
+        self.playing = False
+        self._cancel()
+
+    def _delay(self, i):
+        delay = self.delays[i]
+        return self.default_delay() if delay is None else delay
+
+    def _advance(self):
+        self._after_id = None
+        if self.position + 1 >= len(self.delays):
+            self.playing = False
+            self.on_finish()
+            return
+        self.position += 1
+        self._show(True)
+        self._schedule(self._delay(self.position))
+
+    def _show(self, continuous):
+        self.render(self.position, continuous)
+        if self.on_position is not None:
+            self.on_position(self.position)
+
+    def _schedule(self, delay):
+        self._due = time.perf_counter() * 1000 + delay
+        self._remaining = None
+        self._after_id = self.root.after(int(delay), self._advance)
+
+    def _cancel(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+
+# Shortest time one animated step may take in the "Fit Duration" playback mode
+MIN_FRAME_MS = 40
+
+
+def plan_frames(count, keyframes, budget):
+    """Chooses which of `count` steps to show when only `budget` frames fit.
+
+    Keyframes come first (thinned evenly if they alone would use more than
+    half the budget); the rest of the budget is spread evenly over all
+    steps, always ending on the last one.
+    """
+    if count <= budget:
+        return list(range(count))
+    keyframes = sorted(set(keyframes))
+    if len(keyframes) > budget // 2:
+        keyframes = _spread(keyframes, budget // 2)
+    chosen = set(keyframes)
+    chosen.update(_spread(range(count), max(1, budget - len(chosen))))
+    return sorted(chosen)
+
+
+def _spread(items, n):
+    """`n` of the sequence `items`, picked evenly and always including the last."""
+    if n >= len(items):
+        return list(items)
+    if n <= 1:
+        return [items[-1]]
+    return [items[round(i * (len(items) - 1) / (n - 1))] for i in range(n)]
+
 
 class AdvancedCipherSuiteGUI:
     def __init__(self, root):
@@ -23,17 +399,26 @@ class AdvancedCipherSuiteGUI:
             "matrix_bg": "#2d2d30"
         }
 
-        self.ciphers = {
-            "Caesar": CaesarCipher(),
-            "Vigenère": VigenereCipher(),
-            "Playfair": PlayfairCipher()
+        # Display name -> registry name; cipher instances are created on first use
+        self.cipher_names = {
+            "Caesar": "caesar",
+            "Vigenère": "vigenere",
+            "Playfair": "playfair"
         }
+        self.ciphers = {}
         self.current_cipher = tk.StringVar(value="Playfair")
         self.current_mode = tk.StringVar(value="Encrypt")
+        self.playback_mode = tk.StringVar(value="Per Step")
+        self.total_duration = tk.StringVar(value="10")
+        self.show_stats = tk.BooleanVar(value=metrics.enabled)
         self.is_animating = False
         self.is_paused = False
         self.animation_speed = 800 # ms
         self.canvas = None # Initialize to avoid AttributeError
+        self.worker = None
+        self.vig_view = None
+        self.timeline = None
+        self.result_shown = 0
 
         self.setup_ui()
 
@@ -61,7 +446,33 @@ class AdvancedCipherSuiteGUI:
         self.pause_btn = tk.Button(sidebar_outer, text="PAUSE", command=self.toggle_pause,
                                    bg=self.colors["card"], fg="white", font=("Arial", 11, "bold"), 
                                    padx=20, pady=10, borderwidth=0, cursor="hand2", state="disabled")
-        self.pause_btn.pack(fill="x", pady=(0, 20))
+        self.pause_btn.pack(fill="x", pady=(0, 10))
+
+        # Timeline controls: step back/forward and a scrubber over all frames
+        timeline_row = tk.Frame(sidebar_outer, bg=self.colors["bg"])
+        timeline_row.pack(fill="x", pady=(0, 10))
+        self.step_back_btn = tk.Button(timeline_row, text="◀", command=lambda: self.step_timeline(-1),
+                                       bg=self.colors["card"], fg="white", font=("Arial", 10, "bold"),
+                                       padx=8, borderwidth=0, cursor="hand2", state="disabled")
+        self.step_back_btn.pack(side="left")
+        self.step_fwd_btn = tk.Button(timeline_row, text="▶", command=lambda: self.step_timeline(1),
+                                      bg=self.colors["card"], fg="white", font=("Arial", 10, "bold"),
+                                      padx=8, borderwidth=0, cursor="hand2", state="disabled")
+        self.step_fwd_btn.pack(side="right")
+        self.scrubber = tk.Scale(timeline_row, from_=0, to=0, orient="horizontal", showvalue=False,
+                                 bg=self.colors["bg"], highlightthickness=0, troughcolor=self.colors["card"],
+                                 activebackground=self.colors["accent"], command=self.scrub, state="disabled")
+        self.scrubber.pack(side="left", fill="x", expand=True, padx=5)
+
+        # Progress of the background computation
+        progress_row = tk.Frame(sidebar_outer, bg=self.colors["bg"])
+        progress_row.pack(fill="x", pady=(0, 20))
+        self.cancel_btn = tk.Button(progress_row, text="CANCEL", command=self.cancel_worker,
+                                    bg=self.colors["card"], fg="#ff5555", font=("Arial", 9, "bold"),
+                                    padx=10, borderwidth=0, cursor="hand2", state="disabled")
+        self.cancel_btn.pack(side="right", padx=(10, 0))
+        self.progress = ttk.Progressbar(progress_row, orient="horizontal", mode="determinate", maximum=100)
+        self.progress.pack(side="left", fill="x", expand=True)
 
         # Scrollable Config Area
         sidebar_canvas = tk.Canvas(sidebar_outer, bg=self.colors["bg"], width=300, highlightthickness=0)
@@ -82,7 +493,7 @@ class AdvancedCipherSuiteGUI:
 
         # Cipher Selection
         tk.Label(config_frame, text="Select Cipher", font=("Arial", 11, "bold"), bg=self.colors["bg"], fg=self.colors["dim_text"]).pack(anchor="w", pady=(0, 10))
-        for name in self.ciphers.keys():
+        for name in self.cipher_names:
             rb = tk.Radiobutton(config_frame, text=name, variable=self.current_cipher, value=name,
                                  font=("Arial", 10), bg=self.colors["bg"], fg=self.colors["text"],
                                  selectcolor=self.colors["accent"], activebackground=self.colors["card"],
@@ -119,6 +530,24 @@ class AdvancedCipherSuiteGUI:
         tk.Label(speed_labels, text="Fastest", font=("Arial", 8), bg=self.colors["bg"], fg=self.colors["dim_text"]).pack(side="left", padx=10)
         tk.Label(speed_labels, text="Slowest", font=("Arial", 8), bg=self.colors["bg"], fg=self.colors["dim_text"]).pack(side="right", padx=10)
 
+        # Playback: every step at the slider speed, fitted to a total duration, or no animation
+        tk.Label(config_frame, text="Playback", font=("Arial", 11, "bold"), bg=self.colors["bg"], fg=self.colors["dim_text"]).pack(anchor="w", pady=(20, 10))
+        playback_frame = tk.Frame(config_frame, bg=self.colors["bg"])
+        playback_frame.pack(fill="x")
+        for playback in ["Per Step", "Fit Duration", "Instant"]:
+            rb = tk.Radiobutton(playback_frame, text=playback, variable=self.playback_mode, value=playback,
+                                 font=("Arial", 9), bg=self.colors["bg"], fg=self.colors["text"],
+                                 selectcolor=self.colors["accent"], activebackground=self.colors["card"],
+                                 indicatoron=False, width=9, pady=6)
+            rb.pack(side="left", expand=True, padx=2)
+
+        duration_row = tk.Frame(config_frame, bg=self.colors["bg"])
+        duration_row.pack(fill="x", pady=(8, 0))
+        tk.Label(duration_row, text="Total duration (s)", font=("Arial", 9), bg=self.colors["bg"], fg=self.colors["dim_text"]).pack(side="left", padx=5)
+        tk.Spinbox(duration_row, from_=1, to=3600, width=6, textvariable=self.total_duration,
+                   font=("Consolas", 10), bg=self.colors["card"], fg="white", buttonbackground=self.colors["card"],
+                   borderwidth=0).pack(side="right", padx=5)
+
         # Input Area
         tk.Label(config_frame, text="Input Text", font=("Arial", 11, "bold"), bg=self.colors["bg"], fg=self.colors["dim_text"]).pack(anchor="w", pady=(25, 5))
         self.input_entry = tk.Entry(config_frame, font=("Consolas", 12), bg=self.colors["card"], fg="white", borderwidth=0)
@@ -135,22 +564,101 @@ class AdvancedCipherSuiteGUI:
         tk.Button(config_frame, text="RESET ALL", command=self.clear_fields,
                   font=("Arial", 9, "bold"), bg="#333", fg="#ff5555", 
                   activebackground="#444", borderwidth=0, cursor="hand2", width=30, pady=5).pack(pady=(10, 20))
+
+        # Optional per-phase timings of the last run (logic.metrics)
+        tk.Checkbutton(config_frame, text="Show Stats", variable=self.show_stats, command=self.toggle_stats,
+                       font=("Arial", 10), bg=self.colors["bg"], fg=self.colors["text"],
+                       selectcolor=self.colors["card"], activebackground=self.colors["bg"]).pack(anchor="w")
+        self.stats_text = tk.Text(config_frame, height=10, font=("Consolas", 8), bg=self.colors["card"],
+                                  fg=self.colors["dim_text"], borderwidth=0, state="disabled", wrap="none")
+        self.toggle_stats()
         
         # Initialize Visualization Area
         self.setup_vis_area(main_container)
 
+    def get_cipher(self, name):
+        """The cipher instance for a display name, imported and created on first use."""
+        if name not in self.ciphers:
+            self.ciphers[name] = get_cipher(self.cipher_names[name])(trace="lazy")
+        return self.ciphers[name]
+
+    def toggle_stats(self):
+        if self.show_stats.get():
+            metrics.enable()
+            self.stats_text.pack(fill="x", padx=5, pady=(5, 20))
+        else:
+            metrics.disable()
+            self.stats_text.pack_forget()
+
+    def update_stats(self):
+        """Shows the metrics collected since the run started."""
+        if not self.show_stats.get():
+            return
+        self.stats_text.config(state="normal")
+        self.stats_text.delete("1.0", tk.END)
+        self.stats_text.insert("1.0", metrics.format_table() or "No cipher calls recorded.")
+        self.stats_text.config(state="disabled")
+
     def update_speed(self, val):
         self.animation_speed = int(val)
         if hasattr(self, 'speed_val_label'):
             self.speed_val_label.config(text=f"{val}ms")
 
     def toggle_pause(self):
-        if not self.is_animating: return
+        if not self.is_animating or self.timeline is None: return
         self.is_paused = not self.is_paused
+        if self.is_paused:
+            self.timeline.pause()
+        else:
+            self.timeline.play()
         btn_text = "RESUME" if self.is_paused else "PAUSE"
         self.pause_btn.config(text=btn_text, bg=self.colors["highlight"] if self.is_paused else self.colors["card"])
         self.status_label.config(text="Paused" if self.is_paused else "Animating...")
 
+    def step_timeline(self, n):
+        if self.timeline is None:
+            return
+        if not self.is_paused:
+            self.toggle_pause()
+        self.timeline.step(n)
+
+    def scrub(self, value):
+        # Tk also calls this (from the idle redraw) after sync_scrubber's set();
+        # the timeline is already there then, and seeking would restart its delay
+        if self.timeline is None or int(float(value)) == self.timeline.position:
+            return
+        self.timeline.seek(int(float(value)))
+
+    def sync_scrubber(self, position):
+        self.scrubber.set(position)
+
+    def run_timeline(self, delays, render, final_str, default_delay=None):
+        """Starts playing `delays`/`render` as the current animation."""
+        self.timeline = Timeline(self.root, delays, render, lambda: self.complete_animation(final_str),
+                                 default_delay, self.sync_scrubber)
+        state = "normal" if delays else "disabled"
+        self.scrubber.config(to=max(len(delays) - 1, 0), state=state)
+        self.step_back_btn.config(state=state)
+        self.step_fwd_btn.config(state=state)
+        self.timeline.play()
+
+    def stop_timeline(self):
+        if self.timeline is not None:
+            self.timeline.stop()
+            self.timeline = None
+        self.scrubber.config(state="disabled")
+        self.step_back_btn.config(state="disabled")
+        self.step_fwd_btn.config(state="disabled")
+
+    def show_result_prefix(self, text, length):
+        """Shows the first `length` characters of `text`, appending when moving forward."""
+        if length >= self.result_shown:
+            if length > self.result_shown:
+                self.append_result(text[self.result_shown:length])
+        else:
+            self.set_result(text[:length])
+        self.result_shown = length
+
     def clear_fields(self):
         self.input_entry.delete(0, tk.END)
         self.key_entry.delete(0, tk.END)
@@ -186,6 +694,7 @@ class AdvancedCipherSuiteGUI:
         scrollbar = tk.Scrollbar(log_frame, command=self.log_text.yview)
         scrollbar.pack(side="right", fill="y")
         self.log_text.config(yscrollcommand=scrollbar.set)
+        self.log_writer = BufferedTextWriter(self.root, self.log_text)
 
         # -- VIEW 2: Result View (The "Alone" Display) --
         self.res_view_frame = tk.Frame(self.vis_frame, bg=self.colors["card"])
@@ -205,9 +714,8 @@ class AdvancedCipherSuiteGUI:
                                    height=3, borderwidth=0, wrap="char", highlightthickness=0)
         self.result_text.tag_configure("center", justify='center')
         self.result_text.pack(fill="x", pady=20)
-        self.result_text.insert("1.0", "---")
-        self.result_text.tag_add("center", "1.0", "end")
-        self.result_text.config(state="disabled")
+        self.result_writer = BufferedTextWriter(self.root, self.result_text, ("center",))
+        self.result_writer.reset("---", placeholder=True)
 
         # Action bar under big result
         action_bar = tk.Frame(self.result_card, bg=self.colors["matrix_bg"])
@@ -230,6 +738,7 @@ class AdvancedCipherSuiteGUI:
 
     def swap_to_input(self):
         """Moves current result to input and toggles mode for quick decryption check."""
+        self.result_writer.flush()
         result = self.result_text.get("1.0", tk.END).strip()
         if result and result != "---" and result != "Waiting for animation...":
             self.input_entry.delete(0, tk.END)
@@ -245,6 +754,7 @@ class AdvancedCipherSuiteGUI:
 
     def copy_to_clipboard(self):
         self.root.clipboard_clear()
+        self.result_writer.flush()
         content = self.result_text.get("1.0", tk.END).strip()
         if content == "---" or content == "Waiting for animation...": return
         self.root.clipboard_append(content)
@@ -253,7 +763,12 @@ class AdvancedCipherSuiteGUI:
     def reset_visualization(self):
         if not hasattr(self, 'canvas') or self.canvas is None:
             return
-            
+
+        self.cancel_worker()
+        self.stop_timeline()
+        if self.vig_view is not None:
+            self.vig_view.destroy()
+            self.vig_view = None
         self.canvas.delete("all")
         self.is_animating = False
         
@@ -262,11 +777,9 @@ class AdvancedCipherSuiteGUI:
             self.res_view_frame.pack_forget()
             self.anim_view_frame.pack(fill="both", expand=True)
 
-        self.result_text.config(state="normal")
-        self.result_text.delete("1.0", tk.END)
-        self.result_text.insert("1.0", "---")
-        self.result_text.tag_add("center", "1.0", "end")
-        self.result_text.config(fg=self.colors["success"], state="disabled")
+        self.result_writer.reset("---", placeholder=True)
+        self.result_shown = 0
+        self.result_text.config(fg=self.colors["success"])
         
         self.status_label.config(text="Ready")
         
@@ -275,31 +788,19 @@ class AdvancedCipherSuiteGUI:
         self.vis_title.config(text=f"{self.current_cipher.get()} - {mode} Visualization")
         self.start_btn.config(text=f"START {mode.upper()}")
         
-        self.log_text.config(state="normal")
-        self.log_text.delete("1.0", tk.END)
-        self.log_text.config(state="disabled")
+        self.log_writer.reset()
         
         self.draw_base_layout()
 
     def set_result(self, text):
-        self.result_text.config(state="normal")
-        self.result_text.delete("1.0", tk.END)
-        self.result_text.insert("1.0", text)
-        self.result_text.tag_add("center", "1.0", "end")
-        self.result_text.config(state="disabled")
+        self.result_writer.reset(text)
+        self.result_shown = len(text)
 
     def append_result(self, char):
-        self.result_text.config(state="normal")
-        # If it's the first character, clear the placeholder
-        content = self.result_text.get("1.0", tk.END).strip()
-        if content == "---":
-            self.result_text.delete("1.0", tk.END)
-        self.result_text.insert(tk.END, char)
-        self.result_text.tag_add("center", "1.0", "end")
-        self.result_text.see(tk.END)
-        self.result_text.config(state="disabled")
+        self.result_writer.write(char)
 
     def complete_animation(self, final_str):
+        self.stop_timeline()
         self.is_animating = False
         self.is_paused = False
         self.pause_btn.config(state="disabled", text="PAUSE")
@@ -316,9 +817,8 @@ class AdvancedCipherSuiteGUI:
         
         self.set_result(final_str)
         # Flash result label to signal completion
-        self.result_text.config(state="normal")
         self.result_text.config(fg="white")
-        self.root.after(200, lambda: self.result_text.config(fg=self.colors["success"], state="disabled"))
+        self.root.after(200, lambda: self.result_text.config(fg=self.colors["success"]))
         self.log_history("Done: All transformations complete.")
 
     def draw_base_layout(self):
@@ -361,6 +861,13 @@ class AdvancedCipherSuiteGUI:
             r = self.canvas.create_rectangle(x, y2, x + cell_size, y2 + cell_size, outline="#444444", fill=self.colors["matrix_bg"])
             t = self.canvas.create_text(x + cell_size/2, y2 + cell_size/2, text=char, fill="white", font=("Arial", 10))
             self.alpha_ribbon.append((r, t))
+        self.ribbon_shift = 0
+
+        # Highlight frames and shift label, created once and moved/shown per step
+        self.high_static = self.canvas.create_rectangle(0, 0, 0, 0, outline=self.colors["highlight"], width=3, state="hidden")
+        self.high_ribbon = self.canvas.create_rectangle(0, 0, 0, 0, outline=self.colors["success"], width=3, state="hidden")
+        self.shift_indicator = self.canvas.create_text(0, (y1 + y2) / 2, text="", fill=self.colors["highlight"],
+                                                       font=("Arial", 11, "bold"), state="hidden")
 
     def start_animation(self):
         if self.is_animating: return
@@ -379,22 +886,79 @@ class AdvancedCipherSuiteGUI:
         self.is_paused = False
         self.pause_btn.config(state="normal", text="PAUSE", bg=self.colors["card"])
         self.set_result("") # Start empty for reveal
-
-        cipher = self.ciphers[cipher_name]
+        if self.show_stats.get():
+            metrics.reset()  # The panel shows this run only
+
+        # The cipher runs in a worker thread; its messages are polled from the event loop
+        self.worker = CipherWorker(self.get_cipher(cipher_name), mode, text, key,
+                                   animate=cipher_name == "Playfair" and self.playback_mode.get() != "Instant")
+        self.progress.config(value=0)
+        self.cancel_btn.config(state="normal")
+        self.start_btn.config(state="disabled")
+        self.status_label.config(text="Computing...")
+        self.worker.start()
+        self.root.after(50, self.poll_worker, self.worker, cipher_name, text, key, mode)
+
+    def poll_worker(self, worker, cipher_name, text, key, mode):
+        if worker is not self.worker:
+            return  # Cancelled or superseded; drop its messages
+        message = None
         try:
-            if mode == "Encrypt":
-                res = cipher.encrypt(text, key)
-            else:
-                res = cipher.decrypt(text, key)
-                
-            if cipher_name == "Playfair":
-                self.animate_playfair(cipher._animation_data, res)
-            else:
-                self.animate_standard(cipher_name, text, key, res, mode)
-        except Exception as e:
+            while True:
+                message = worker.queue.get_nowait()
+                if message[0] != "progress":
+                    break
+                self.progress.config(value=100 * message[1] / max(message[2], 1))
+        except queue.Empty:
+            pass
+        if message is None or message[0] == "progress":
+            self.root.after(50, self.poll_worker, worker, cipher_name, text, key, mode)
+            return
+
+        self.worker = None
+        self.cancel_btn.config(state="disabled")
+        self.start_btn.config(state="normal")
+        self.update_stats()
+        if message[0] == "cancelled":
+            self.is_animating = False
+            self.status_label.config(text="Cancelled")
+        elif message[0] == "error":
             self.is_animating = False
             self.set_result("Error occurred")
-            messagebox.showerror("Error", str(e))
+            self.status_label.config(text="Ready")
+            messagebox.showerror("Error", message[1])
+        else:
+            _, res, animation = message
+            self.progress.config(value=100)
+            self.status_label.config(text="Animating...")
+            if self.playback_mode.get() == "Instant":
+                self.complete_animation(res)
+            elif cipher_name == "Playfair":
+                self.animate_playfair(animation, res)
+            else:
+                self.animate_standard(cipher_name, text, key, res, mode)
+
+    def cancel_worker(self):
+        if self.worker is None:
+            return
+        self.worker.cancel()
+        self.worker = None
+        self.is_animating = False
+        self.cancel_btn.config(state="disabled")
+        self.start_btn.config(state="normal")
+        self.progress.config(value=0)
+        self.status_label.config(text="Cancelled")
+
+    def playback_plan(self, count, keyframes):
+        """Returns `(frames, delay_ms)`: the step indices to show and the time per shown step."""
+        if self.playback_mode.get() != "Fit Duration":
+            return range(count), self.animation_speed
+        try:
+            duration = max(1.0, float(self.total_duration.get())) * 1000
+        except ValueError:
+            duration = 10000.0
+        frames = plan_frames(count, keyframes, max(1, int(duration // MIN_FRAME_MS)))
+        return frames, duration / max(len(frames), 1)
 
     def animate_playfair(self, data, final_str):
         matrix = data["matrix"]
@@ -405,48 +969,46 @@ class AdvancedCipherSuiteGUI:
             for c in range(5):
                 self.canvas.itemconfig(self.matrix_cells[(r, c)][1], text=matrix[r][c])
 
-        def step_anim(idx):
-            if not self.is_animating or idx >= len(steps):
-                self.complete_animation(final_str)
-                return
+        # Keyframes: every change of rule
+        keyframes = [i for i, step in enumerate(steps) if i == 0 or step["rule"] != steps[i-1]["rule"]]
+        frames, delay = self.playback_plan(len(steps), keyframes)
+        adaptive = self.playback_mode.get() == "Fit Duration"
+        # Fixed-speed playback keeps its 400 ms lead-in; fitted playback splits each frame in two.
+        # None follows the speed slider while playing.
+        lead_in, hold = (delay / 2, delay / 2) if adaptive else (400, None)
+
+        # Two frames per pair: the source letters, then the result letters
+        timeline = []
+        delays = []
+        for idx in frames:
+            timeline += [(idx, 0), (idx, 1)]
+            delays += [lead_in, hold]
+        lit = []
+
+        def render(i, continuous):
+            idx, phase = timeline[i]
+            step = steps[idx]
+            coords = step["coords"]
 
-            for r_c in self.matrix_cells.values():
-                self.canvas.itemconfig(r_c[0], fill=self.colors["matrix_bg"])
+            # Reset only the cells lit by the previous frame
+            for cell in lit:
+                self.canvas.itemconfig(self.matrix_cells[cell][0], fill=self.colors["matrix_bg"])
+            lit[:] = coords if phase else coords[:2]
 
-            step = steps[idx]
             self.status_label.config(text=f"Pair {idx+1}: {step['pair']} -> {step['result']} ({step['rule']})")
-            coords = step["coords"]
-            
-            # Original letters in yellow
+            # Original letters in yellow, then their replacements in green
             self.canvas.itemconfig(self.matrix_cells[coords[0]][0], fill="#ff9900")
             self.canvas.itemconfig(self.matrix_cells[coords[1]][0], fill="#ff9900")
-            
-            def highlight_target():
-                if self.is_paused:
-                    self.root.after(200, highlight_target)
-                    return
+            if phase:
                 self.canvas.itemconfig(self.matrix_cells[coords[2]][0], fill="#00aa00")
                 self.canvas.itemconfig(self.matrix_cells[coords[3]][0], fill="#00aa00")
-                
-                # Update revealed result
-                self.append_result(step["result"])
-                
+
+            # Revealed result up to this pair
+            self.show_result_prefix(final_str, 2 * (idx + phase))
+            if phase and continuous:
                 self.log_history(f"Step {idx+1} ({mode}): {step['pair']} -> {step['result']} ({step['rule']})")
-                
-                def wait_for_next():
-                    if self.is_paused:
-                        self.root.after(200, wait_for_next)
-                    else:
-                        step_anim(idx+1)
-                
-                self.root.after(self.animation_speed, wait_for_next)
-
-            if self.is_paused:
-                self.root.after(200, lambda: step_anim(idx)) # Retry same index
-            else:
-                self.root.after(400, highlight_target)
 
-        step_anim(0)
+        self.run_timeline(delays, render, final_str, lambda: self.animation_speed)
 
     def animate_standard(self, name, text, key, result, mode):
         alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
@@ -458,131 +1020,90 @@ class AdvancedCipherSuiteGUI:
             label_y = 200
             grid_y1 = 230
             grid_y2 = 255
-            cell_w = 25
-            
+
             self.canvas.create_text(40, label_y, text=f"Alignment Array ({mode}):", fill=self.colors["dim_text"], anchor="w", font=("Arial", 10, "bold"))
             self.canvas.create_text(20, grid_y1 + 12, text="T:", fill=self.colors["dim_text"], anchor="w", font=("Arial", 8, "bold"))
             self.canvas.create_text(20, grid_y2 + 12, text="K:", fill=self.colors["dim_text"], anchor="w", font=("Arial", 8, "bold"))
 
-            self.vig_text_cells = []
-            self.vig_key_cells = []
-            
-            # Draw array of cells for input text and repeated key
-            for i, char in enumerate(text):
-                # We limit to what fits roughly on screen to avoid messy overflow
-                if i > 25: break 
-                x = 40 + i * cell_w
-                
-                # Text Row Cell
-                r1 = self.canvas.create_rectangle(x, grid_y1, x + cell_w, grid_y1 + 22, outline="#444", fill=self.colors["matrix_bg"])
-                t1 = self.canvas.create_text(x + cell_w/2, grid_y1 + 11, text=char.upper(), fill="white", font=("Consolas", 10))
-                self.vig_text_cells.append((r1, t1, x))
-                
-                # Key Row Cell
-                k_char = key[i % len(key)].upper() if char.isalpha() else " "
-                r2 = self.canvas.create_rectangle(x, grid_y2, x + cell_w, grid_y2 + 22, outline="#444", fill=self.colors["matrix_bg"])
-                # Key text starts as empty string to 'hide' initially
-                t2 = self.canvas.create_text(x + cell_w/2, grid_y2 + 11, text="", fill=self.colors["success"], font=("Consolas", 10, "bold"))
-                self.vig_key_cells.append((r2, t2, k_char))
+            # Only the visible window of cells exists; it follows the animation and can be scrolled
+            self.vig_view = AlignmentViewport(self.canvas, text, key, 40, grid_y1, self.colors)
 
         def update_ribbon(shift):
             if mode == "Decrypt": shift = -shift
-            shifted_alpha = alphabet[shift % 26:] + alphabet[:shift % 26]
+            shift %= 26
+            if shift == self.ribbon_shift:
+                return
+            self.ribbon_shift = shift
+            shifted_alpha = alphabet[shift:] + alphabet[:shift]
             for i, char in enumerate(shifted_alpha):
                 self.canvas.itemconfig(self.alpha_ribbon[i][1], text=char)
 
-        def step_anim(idx, result_idx=0):
-            if idx >= len(text):
-                self.complete_animation(result)
-                return
+        if self.playback_mode.get() == "Fit Duration":
+            # Only letters are candidate frames; keyframes are the first pass through the key
+            letters = [i for i, ch in enumerate(text) if ch in LETTERS]
+            keyframes = range(min(len(letters), len(key) if name == "Vigenère" else 1))
+            picks, delay = self.playback_plan(len(letters), keyframes)
+            frames, hold = [letters[i] for i in picks], delay / 2
+        else:
+            # None follows the speed slider while playing
+            frames, hold = range(len(text)), None
+
+        # Two frames per letter (highlight, then reveal) and one per non-letter
+        timeline = []
+        delays = []
+        for idx in frames:
+            if text[idx] in LETTERS:
+                timeline += [(idx, 0), (idx, 1)]
+                delays += [hold, hold]
+            else:
+                timeline.append((idx, 1))
+                delays.append(50)
 
+        def render(i, continuous):
+            idx, phase = timeline[i]
             char = text[idx].upper()
-            if not char.isalpha():
-                if self.is_paused:
-                    self.root.after(200, lambda: step_anim(idx, result_idx))
-                    return
-                # For non-alpha, highlight text box if it exists
-                if name == "Vigenère" and idx < len(self.vig_text_cells):
-                    self.canvas.itemconfig(self.vig_text_cells[idx][0], fill=self.colors["sidebar"])
-
-                self.append_result(text[idx])
-                self.root.after(50, lambda: step_anim(idx+1, result_idx))
+            if name == "Vigenère":
+                # Highlight the current alignment and reveal its key letter
+                self.vig_view.set_current(idx)
+
+            if char in LETTERS:
+                if name == "Caesar":
+                    shift = int(key) % 26
+                    display_shift = shift if mode == "Encrypt" else -shift
+                    self.status_label.config(text=f"Letter {idx+1}: {char} | Shift: {display_shift}")
+                else: # Vigenere
+                    k_char = self.vig_view.key_char(idx)
+                    shift = (ord(k_char) - ord('A')) % 26
+                    display_shift = shift if mode == "Encrypt" else -shift
+                    self.status_label.config(text=f"Letter {idx+1}: {char} | Key: {k_char} (Shift: {display_shift})")
+                update_ribbon(shift)
+
+            if phase or char not in LETTERS:
+                for item in (self.high_static, self.high_ribbon, self.shift_indicator):
+                    self.canvas.itemconfig(item, state="hidden")
+                # Non-letters are kept in place, so the output lines up with the input
+                self.show_result_prefix(result, idx + 1)
+                if continuous and char in LETTERS:
+                    self.log_history(f"[{mode}] '{char}' -> '{result[idx]}'")
                 return
 
-            if name == "Caesar":
-                shift = int(key) % 26
-                display_shift = shift if mode == "Encrypt" else -shift
-                self.status_label.config(text=f"Letter {idx+1}: {char} | Shift: {display_shift}")
-            else: # Vigenere
-                result_idx_val = result_idx
-                k_char = key[result_idx_val % len(key)].upper()
-                shift = (ord(k_char) - ord('A')) % 26
-                display_shift = shift if mode == "Encrypt" else -shift
-                self.status_label.config(text=f"Letter {idx+1}: {char} | Key: {k_char} (Shift: {display_shift})")
-                
-                # Highlight Grid Cells
-                if idx < len(self.vig_text_cells):
-                    # Reset all previous
-                    for cell_idx in range(len(self.vig_text_cells)):
-                        self.canvas.itemconfig(self.vig_text_cells[cell_idx][0], fill=self.colors["matrix_bg"])
-                        self.canvas.itemconfig(self.vig_key_cells[cell_idx][0], fill=self.colors["matrix_bg"])
-                    
-                    # Current alignment
-                    self.canvas.itemconfig(self.vig_text_cells[idx][0], fill=self.colors["highlight"])
-                    self.canvas.itemconfig(self.vig_key_cells[idx][0], fill=self.colors["highlight"])
-                    # Reveal the key letter for this step
-                    self.canvas.itemconfig(self.vig_key_cells[idx][1], text=self.vig_key_cells[idx][2])
-            
             # Draw Numeric Shift Indicator (+N/-N)
-            shift_val = display_shift
-            sign = "+" if shift_val >= 0 else "-"
-            shift_text = f"{sign}{abs(shift_val)}"
-            shift_indicator = self.canvas.create_text(40 + (ord(char)-ord('A'))*cell_size + cell_size/2, 
-                                                    (y1+y2)/2, text=shift_text, 
-                                                    fill=self.colors["highlight"], font=("Arial", 11, "bold"))
-            
-            update_ribbon(shift)
-            
-            orig_idx = ord(char) - ord('A')
-            x_pos = 40 + orig_idx * cell_size
-            
-            high1 = self.canvas.create_rectangle(x_pos, y1, x_pos + cell_size, y1 + cell_size, outline=self.colors["highlight"], width=3)
-            high2 = self.canvas.create_rectangle(x_pos, y2, x_pos + cell_size, y2 + cell_size, outline=self.colors["success"], width=3)
-            
-            new_char = result[result_idx]
-            
-            def next_step():
-                if self.is_paused:
-                    self.root.after(200, next_step)
-                    return
-                    
-                self.canvas.delete(high1)
-                self.canvas.delete(high2)
-                if 'shift_indicator' in locals():
-                    self.canvas.delete(shift_indicator)
-                self.append_result(new_char)
-                self.log_history(f"[{mode}] '{char}' -> '{new_char}'")
-                
-                def wait_for_next():
-                    if self.is_paused:
-                        self.root.after(200, wait_for_next)
-                    else:
-                        step_anim(idx+1, result_idx+1)
-                
-                self.root.after(self.animation_speed, wait_for_next)
-
-            if self.is_paused:
-                self.root.after(200, lambda: step_anim(idx, result_idx))
-            else:
-                self.root.after(self.animation_speed, next_step)
+            sign = "+" if display_shift >= 0 else "-"
+            shift_text = f"{sign}{abs(display_shift)}"
+            self.canvas.coords(self.shift_indicator, 40 + (ord(char)-ord('A'))*cell_size + cell_size/2, (y1+y2)/2)
+            self.canvas.itemconfig(self.shift_indicator, text=shift_text, state="normal")
+
+            x_pos = 40 + (ord(char) - ord('A')) * cell_size
+            self.canvas.coords(self.high_static, x_pos, y1, x_pos + cell_size, y1 + cell_size)
+            self.canvas.coords(self.high_ribbon, x_pos, y2, x_pos + cell_size, y2 + cell_size)
+            self.canvas.itemconfig(self.high_static, state="normal")
+            self.canvas.itemconfig(self.high_ribbon, state="normal")
+            self.show_result_prefix(result, idx)
 
-        step_anim(0)
+        self.run_timeline(delays, render, result, lambda: self.animation_speed)
 
     def log_history(self, message):
-        self.log_text.config(state="normal")
-        self.log_text.insert(tk.END, f"• {message}\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state="disabled")
+        self.log_writer.write(f"• {message}\n")
 
 if __name__ == "__main__":
     root = tk.Tk()
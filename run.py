@@ -1,8 +1,9 @@
-from main_gui import AdvancedCipherSuiteGUI
-import tkinter as tk
-
 if __name__ == "__main__":
     print("Starting Advanced Classical Cipher Suite...")
+    # Imported only now, so the message above appears before Tkinter loads
+    import tkinter as tk
+    from main_gui import AdvancedCipherSuiteGUI
+
     root = tk.Tk()
     app = AdvancedCipherSuiteGUI(root)
     print("GUI initialized. Opening window...")
@@ -41,5 +41,444 @@ def test_ciphers():
 
     print("All logic tests passed!")
 
+def test_caesar_translate():
+    c = CaesarCipher()
+    text = "Hello, World! xyz"
+    res = c.encrypt(text, 29)
+    assert res == "Khoor, Zruog! abc"
+    assert c.decrypt(res, 29) == text
+    # Byte input goes through bytes.translate and stays bytes
+    assert c.encrypt(text.encode(), 3) == res.encode()
+    assert c.decrypt(bytearray(res.encode()), 3) == text.encode()
+    # Non-ASCII characters are passed through untouched
+    assert c.encrypt("café", 1) == "dbgé"
+
+def test_trace_modes():
+    # encrypt/decrypt return plain text; the traced variants return a CipherResult
+    c = CaesarCipher()
+    assert c.encrypt("HELLO", 3) == "KHOOR"
+    result = c.encrypt_traced("HELLO", 3)
+    assert result.text == "KHOOR"
+    assert result.steps[0] == "H -> K (Shift 3)"
+
+    # Lazy and full tracing produce the same steps
+    lazy = VigenereCipher(trace="lazy").encrypt_traced("AT TACK", "LEMON")
+    full = VigenereCipher(trace="full").encrypt_traced("AT TACK", "LEMON")
+    assert lazy.steps == full.steps
+    assert lazy.steps[0] == "A + L -> L"
+
+    # A trace limit keeps only the most recent steps
+    capped = CaesarCipher(trace="full", trace_limit=2)
+    assert capped.encrypt_traced("ABCDE", 1).steps == ["D -> E (Shift 1)", "E -> F (Shift 1)"]
+
+    p = PlayfairCipher()
+    result = p.encrypt_traced("INSTRUMENTS", "MONARCHY")
+    assert result.text == p.encrypt("INSTRUMENTS", "MONARCHY")
+    assert result.animation["steps"][0] == {"pair": "IN", "result": "GA", "rule": "Rectangle",
+                                            "coords": [(2, 3), (0, 2), (2, 2), (0, 3)]}
+    off = PlayfairCipher(trace="off").encrypt_traced("INSTRUMENTS", "MONARCHY")
+    assert off.steps == [] and off.animation is None
+
+    # One instance shared by many threads keeps every call's trace separate
+    from concurrent.futures import ThreadPoolExecutor
+    v = VigenereCipher()
+    words = ["ATTACK", "DAWN", "HELLO", "WORLD"] * 25
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda w: (w, v.encrypt_traced(w, "KEY")), words))
+    for word, result in results:
+        assert result.text == v.encrypt(word, "KEY")
+        assert len(result.steps) == len(word)
+
+def test_vigenere_engines():
+    from logic import vigenere
+    text = "Attack at dawn!\tMeet @ [noon] `x` {z} ... ATTACKATDAWN" * 50
+    shifts = vigenere.key_shifts("LeMoN")
+    expected = vigenere._shift_python(text, shifts, 0)[0]
+    assert VigenereCipher().encrypt(text, "LeMoN") == expected
+    assert VigenereCipher().encrypt(text.encode(), "LeMoN") == expected.encode()
+    assert VigenereCipher().decrypt(expected, "LeMoN") == text
+    # Non-ASCII text takes the wide code point path
+    assert vigenere.vigenere_shift("añb", [1]) == "bñc"
+    if vigenere.np is not None:
+        assert vigenere._shift_numpy(text, shifts, 3) == vigenere._shift_python(text, shifts, 3)
+        # Several blocks, with a key short enough for the lane path and one too long for it
+        long_text = text * 30 + "añb"
+        for key in (shifts, list(range(26)) * 10):
+            assert vigenere._shift_numpy(long_text, key, 7) == vigenere._shift_python(long_text, key, 7)
+            assert vigenere._shift_numpy(long_text.encode(), key, 7) == vigenere._shift_python(long_text.encode(), key, 7)
+
+def test_playfair_compiled_key():
+    from logic.playfair import pad_digraphs
+    key = PlayfairCipher().compile("Monarchy")
+    # Equivalent keys share one cached compiled object
+    assert PlayfairCipher().compile("MONARCHY!") is key
+    assert key.positions["J"] == key.positions["I"] == (2, 3)
+    assert len(key.encrypt_table) == len(key.decrypt_table) == 625
+    for pair, result in key.encrypt_table.items():
+        assert key.decrypt_table[result] == pair
+    assert pad_digraphs("BALLOON") == "BALXLOON"
+    assert pad_digraphs("AAA") == "AXAXAX"
+    p = PlayfairCipher()
+    assert p.encrypt("Hide the gold in the tree stump", "playfair example") == "BMODZBXDNABEKUDMUIXMMOUVIF"
+    for bad_key in (5, 10 ** 9, None, ["KEY"]):
+        try:
+            p.encrypt("HELLO", bad_key)
+            assert False, "expected an error"
+        except TypeError:
+            pass
+
+def test_streaming():
+    import io
+    text = "Balloons and bookkeepers, attack at dawn! " * 7
+    chunks = [text[i:i+5] for i in range(0, len(text), 5)]
+    for cipher, key in ((CaesarCipher(), 3), (VigenereCipher(), "LEMON"), (PlayfairCipher(), "MONARCHY")):
+        expected = cipher.encrypt(text, key)
+        assert "".join(cipher.encrypt_stream(chunks, key)) == expected
+        assert "".join(cipher.encrypt_stream(io.StringIO(text), key, chunk_size=3)) == expected
+        assert b"".join(cipher.encrypt_stream(io.BytesIO(text.encode()), key, chunk_size=4)) == expected.encode()
+        assert "".join(cipher.decrypt_stream(io.StringIO(expected), key, chunk_size=7)) == cipher.decrypt(expected, key)
+
+    # Odd-length Playfair ciphertext is only detected once the stream ends
+    try:
+        list(PlayfairCipher().decrypt_stream(["ABC"], "KEY"))
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+def test_cli():
+    import io, tempfile
+    from logic.__main__ import build_parser, main, run
+    args = build_parser().parse_args(["encrypt", "-c", "vigenere", "-k", "LEMON"])
+    out = io.BytesIO()
+    run(args, stdin=io.BytesIO(b"Attack at dawn\n"), stdout=out)
+    assert out.getvalue() == b"Lxfopv ef rnhr\n"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src, enc = f"{tmp}/in.txt", f"{tmp}/out.txt"
+        with open(src, "wb") as f:
+            f.write(b"INSTRUMENTS")
+        assert main(["encrypt", "-c", "playfair", "-k", "MONARCHY", "-i", src, "-o", enc, "--mmap"]) == 0
+        with open(enc, "rb") as f:
+            assert f.read() == b"GATLMZCLRQXA"
+        # A bad key or -o naming the input fails without touching either file
+        assert main(["encrypt", "-c", "caesar", "-k", "x", "-i", src, "-o", enc]) == 1
+        assert main(["encrypt", "-c", "caesar", "-k", "3", "-i", src, "-o", src]) == 1
+        with open(enc, "rb") as f, open(src, "rb") as g:
+            assert f.read() == b"GATLMZCLRQXA" and g.read() == b"INSTRUMENTS"
+
+def test_parallel():
+    from logic.parallel import parallel_encrypt, parallel_decrypt
+    text = "Balloons and bookkeepers, attack at dawn! XXXX " * 40
+    for cipher, key in ((CaesarCipher(), 3), (VigenereCipher(), "LEMON"), (PlayfairCipher(), "MONARCHY")):
+        expected = cipher.encrypt(text, key)
+        # Odd chunk sizes put chunk edges inside digraphs and key periods
+        assert parallel_encrypt(cipher, text, key, workers=2, chunk_size=37) == expected
+        assert parallel_decrypt(cipher, expected, key, workers=2, chunk_size=37) == cipher.decrypt(expected, key)
+
+def test_benchmark_gate():
+    from benchmarks.bench_ciphers import compare, run_benchmarks
+    results = run_benchmarks(["caesar", "playfair"], [1024], [5], repeat=1, log=lambda row: None)
+    assert {(r["cipher"], r["mode"]) for r in results} == {
+        ("caesar", "encrypt"), ("caesar", "decrypt"), ("playfair", "encrypt"), ("playfair", "decrypt")}
+    assert compare(results, results, 0.10) == []
+    faster = [dict(r, throughput_mb_s=r["throughput_mb_s"] * 2) for r in results]
+    assert len(compare(results, faster, 0.10)) == len(results)
+
+def test_caesar_crack():
+    c = CaesarCipher()
+    message = "Defend the east wall of the castle at midnight, and bring the usual supplies."
+    for shift in (0, 7, 25):
+        ciphertext = c.encrypt(message, shift)
+        for method in ("chi2", "loglik"):
+            cracked = c.crack(ciphertext, method)
+            assert cracked.shift == shift
+            assert cracked.plaintext == message
+            assert sorted(s for s, _ in cracked.ranking) == list(range(26))
+    from logic.analysis import letter_histogram
+    assert letter_histogram("AaB!") == letter_histogram(b"AaB!") == [2, 1] + [0] * 24
+
+def test_vigenere_crack():
+    v = VigenereCipher()
+    plaintext = open(__file__.replace("test_logic.py", "README.md"), encoding="utf-8").read()
+    for key in ("Q", "LEMON", "CRYPTOGRAPHY"):
+        cracked = v.crack(v.encrypt(plaintext, key))
+        assert cracked.key == key
+        assert cracked.plaintext == plaintext
+
+def test_playfair_solver():
+    from logic import playfair_solver
+    if playfair_solver.np is None:
+        return
+    from logic.playfair import ALPHABET
+    p = PlayfairCipher()
+    plaintext = "When the messenger reached the camp he found that the general had already left"
+    ciphertext = p.encrypt(plaintext, "PLAYFAIR EXAMPLE")
+    # Table-driven trial decryption agrees with the cipher
+    decryptor = playfair_solver.TrialDecryptor(ciphertext)
+    square = playfair_solver.np.array([ALPHABET.index(c) for c in p.compile("PLAYFAIR EXAMPLE").matrix_chars])
+    assert "".join(ALPHABET[i] for i in decryptor.decrypt(square)) == p.decrypt(ciphertext, "PLAYFAIR EXAMPLE")
+
+    calls = []
+    solution = playfair_solver.solve_playfair(ciphertext, restarts=2, iterations=200, workers=1, seed=1,
+                                              progress=lambda *args: calls.append(args))
+    assert sorted(solution.key) == sorted(ALPHABET)
+    assert p.decrypt(ciphertext, solution.key) == solution.plaintext
+    assert [c[0] for c in calls] == [1, 2]
+    # Reaching the threshold stops the search early
+    calls.clear()
+    playfair_solver.solve_playfair(ciphertext, restarts=3, iterations=10, workers=1, seed=1,
+                                   threshold=-100.0, progress=lambda *args: calls.append(args))
+    assert len(calls) == 1
+    for bad in ({"restarts": 0}, {"iterations": 0}):
+        try:
+            playfair_solver.solve_playfair(ciphertext, workers=1, **bad)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+def test_encrypt_into():
+    data = b"Attack at dawn, bookkeeper!"
+    for cipher, key in ((CaesarCipher(), 3), (VigenereCipher(), "LEMON")):
+        expected = cipher.encrypt(data, key)
+        buf = bytearray(data)
+        assert cipher.encrypt_into(buf, key) == len(data)
+        assert buf == expected
+        cipher.decrypt_into(memoryview(buf), key)
+        assert buf == data
+        out = bytearray(len(data) + 5)
+        assert cipher.encrypt_into(data, key, out) == len(data)
+        assert out[:len(data)] == expected
+
+    p = PlayfairCipher()
+    out = bytearray(p.output_size(b"INSTRUMENTS"))
+    assert p.encrypt_into(b"INSTRUMENTS", "MONARCHY", out) == 12
+    assert out == b"GATLMZCLRQXA"
+    assert p.decrypt_into(out, "MONARCHY") == 12
+    assert out == b"INSTRUMENTSX"
+    for bad_out in (b"read-only buffer", bytearray(3)):
+        try:
+            p.encrypt_into(b"INSTRUMENTS", "MONARCHY", bad_out)
+            assert False, "expected an error"
+        except (TypeError, ValueError):
+            pass
+
+def test_key_cache():
+    from logic.cipher_base import KeyCache, key_cache
+    from logic.caesar import CaesarKey
+    cache = KeyCache(maxsize=2)
+    build = lambda k: (lambda: k.upper())
+    assert cache.get("a", build("a")) == "A"
+    assert cache.get("a", build("x")) == "A"
+    cache.get("b", build("b"))
+    cache.get("c", build("c"))  # evicts "a", the least recently used
+    info = cache.info()
+    assert (info.hits, info.misses, info.evictions, info.currsize) == (1, 3, 1, 2)
+    assert cache.get("a", build("z")) == "Z"
+    cache.resize(1)
+    assert cache.info().currsize == 1
+    cache.resize(0)
+    assert cache.info().currsize == 0 and cache.get("q", build("q")) == "Q"
+    assert cache.info().currsize == 0
+
+    # Ciphers compile keys once and accept compiled keys directly
+    v = VigenereCipher()
+    hits = key_cache.info().hits
+    assert v.compile("LEMON") is v.compile("LEMON")
+    assert key_cache.info().hits > hits
+    compiled = v.compile("LEMON")
+    assert v.encrypt("ATTACKATDAWN", compiled) == v.encrypt("ATTACKATDAWN", "LEMON") == "LXFOPVEFRNHR"
+    assert CaesarCipher().compile("29") == CaesarKey(3)
+    assert CaesarCipher().decrypt("KHOOR", CaesarKey(3)) == "HELLO"
+    p = PlayfairCipher()
+    assert p.compile("monarchy") is p.compile("MONARCHY")
+    try:
+        CaesarCipher().compile("abc")
+        assert False, "expected an error"
+    except ValueError:
+        pass
+
+def test_lazy_registry():
+    import subprocess, sys
+    import logic
+    from logic.vigenere import VigenereCipher as Vigenere
+    assert logic.get_cipher("vigenere") is logic.get_cipher("Vigenere") is Vigenere
+    assert logic.VigenereCipher is Vigenere
+    try:
+        logic.get_cipher("enigma")
+        assert False, "expected an error"
+    except ValueError:
+        pass
+    # Importing the package loads no cipher module
+    code = "import logic, sys; print(sorted(m for m in sys.modules if m.startswith('logic.') or m == 'numpy'))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+    from benchmarks.bench_startup import compare, import_cost, parse_importtime
+    entries = parse_importtime("import time: self [us] | cumulative | imported package\n"
+                               "import time:       100 |        100 |   logic.cipher_base\n"
+                               "import time:        50 |        150 | logic.caesar\n"
+                               "import time:        20 |         20 | logic\n")
+    assert entries[0] == (100, 100, 1, "logic.cipher_base")
+    assert import_cost("logic.caesar", entries) == 170
+    rows = [{"module": "logic", "import_us": 100}]
+    assert compare(rows, rows, 0.25) == []
+    assert len(compare([{"module": "logic", "import_us": 200}], rows, 0.25)) == 1
+
+def test_service():
+    import asyncio, os, tempfile
+    from logic.service import CipherClient, CipherServer
+
+    async def scenario():
+        server = CipherServer(window=0.001, pool="thread", inline_limit=64)
+        host, port = await server.start_tcp()
+        async with await CipherClient.connect(host, port) as client:
+            assert await client.encrypt("vigenere", "ATTACKATDAWN", "LEMON") == "LXFOPVEFRNHR"
+            assert await client.decrypt("caesar", "KHOOR", 3) == "HELLO"
+            # Pipelined requests sharing a key are batched
+            words = [f"WORD{i}" for i in range(50)]
+            out = await asyncio.gather(*(client.encrypt("caesar", w, 1) for w in words))
+            assert out == [CaesarCipher().encrypt(w, 1) for w in words]
+            # A large request runs in the pool
+            long_text = "ATTACKATDAWN" * 20
+            assert await client.encrypt("vigenere", long_text, "LEMON") == VigenereCipher().encrypt(long_text, "LEMON")
+            for args in (("playfair", "ABC", "KEY"), ("enigma", "ABC", "KEY"), ("caesar", "ABC", "x"),
+                         ("playfair", "ABCD", 2 ** 70), ("vigenere", "ABC", 5)):
+                try:
+                    await client.decrypt(*args)
+                    assert False, "expected an error"
+                except ValueError:
+                    pass
+        assert server.stats["batches"] < server.stats["requests"]
+        assert server.stats["pooled_batches"] >= 1
+        await server.close()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cipher.sock")
+            server = CipherServer(pool="thread")
+            await server.start_unix(path)
+            async with await CipherClient.connect(path=path) as client:
+                assert await client.encrypt("playfair", "HIDE THE GOLD", "PLAYFAIR") == \
+                    PlayfairCipher().encrypt("HIDE THE GOLD", "PLAYFAIR")
+            await server.close()
+
+    asyncio.run(scenario())
+
+def test_batch():
+    messages = ["Attack at dawn!", "", "Grüße, Welt", b"HELLO bytes", "ODD"]
+    for cipher, keys in ((CaesarCipher(), [0, 3, -1, 29]),
+                         (VigenereCipher(), ["LEMON", "a", "KeY"]),
+                         (PlayfairCipher(), ["PLAYFAIR", "MONARCHY"])):
+        rows = cipher.encrypt_batch(messages, keys)
+        assert rows == [[cipher.encrypt(m, k) for k in keys] for m in messages]
+        for row in rows:
+            assert cipher.decrypt_batch(row, keys) == [[cipher.decrypt(r, k) for k in keys] for r in row]
+    from logic import batch
+    if batch.np is not None:
+        codes, lengths = CaesarCipher().decrypt_batch(["KHOOR", "IFMMP!"], range(26), as_array=True)
+        assert codes.shape == (2, 26, 6) and list(lengths) == [5, 6]
+        assert codes[0, 3, :5].tobytes() == b"HELLO" and codes[1, 1].tobytes() == b"HELLO!"
+    try:
+        PlayfairCipher().decrypt_batch(["ABC"], ["KEY"])
+        assert False, "expected an error"
+    except ValueError:
+        pass
+
+def test_file_transform():
+    import os, tempfile
+    from logic.__main__ import main
+    from logic.files import read_checkpoint, transform_file, transform_in_place
+    data = b"Attack at dawn, bookkeeper! \xe9t\xe9\n" * 1000
+    v = VigenereCipher()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.txt")
+        with open(path, "wb") as f:
+            f.write(data)
+
+        class Interrupted(Exception):
+            pass
+
+        def stop_after_two(offset, size):
+            if offset >= 2 * 4096:
+                raise Interrupted
+        try:
+            transform_in_place(path, v, "LEMON", window=4096, progress=stop_after_two)
+            assert False, "expected an interruption"
+        except Interrupted:
+            pass
+        header, undo = read_checkpoint(path + ".ckpt")
+        assert header["offset"] == 2 * 4096 and undo == b""
+        try:
+            transform_in_place(path, v, "OTHER")
+            assert False, "expected a checkpoint mismatch"
+        except ValueError:
+            pass
+        assert transform_in_place(path, v, "LEMON") == len(data) - 2 * 4096
+        assert not os.path.exists(path + ".ckpt")
+        with open(path, "rb") as f:
+            assert f.read() == v.encrypt(data, "LEMON")
+        assert main(["decrypt", "-c", "vigenere", "-k", "LEMON", "-i", path, "--in-place"]) == 0
+        with open(path, "rb") as f:
+            assert f.read() == data
+
+        p = PlayfairCipher()
+        out = os.path.join(tmp, "data.enc")
+        assert transform_file(path, out, p, "MONARCHY", window=4096) == os.path.getsize(out)
+        with open(out, "rb") as f:
+            assert f.read() == p.encrypt(data, "MONARCHY")
+        try:
+            transform_in_place(path, p, "MONARCHY")
+            assert False, "expected an error"
+        except ValueError:
+            pass
+
+def test_metrics():
+    import os, subprocess, sys
+    from logic import metrics
+    v, p = VigenereCipher(), PlayfairCipher()
+    was_enabled = metrics.enabled
+    v.encrypt("untracked", "LEMON")
+    with metrics.collect(clear=True):
+        assert metrics.enabled
+        v.encrypt("ATTACKATDAWN", "LEMON")
+        assert v.decrypt_traced("LXFOPVEFRNHR", "LEMON").steps[0] == "L - L -> A"
+        "".join(p.encrypt_stream(iter(["HIDE THE ", "GOLD"]), "PLAYFAIR"))
+    assert metrics.enabled == was_enabled
+    p.encrypt("untracked", "PLAYFAIR")
+    data = metrics.snapshot()
+    assert data["vigenere"]["encrypt"]["calls"] == 1 and data["vigenere"]["encrypt"]["chars"] == 12
+    assert list(data["vigenere"]["decrypt"]["phases"]) == ["key", "substitute", "format"]
+    stream = data["playfair"]["encrypt"]
+    assert stream["calls"] == 1 and stream["chars"] == 13
+    assert stream["phases"]["prepare"]["runs"] == 2 and stream["phases"]["key"]["seconds"] >= 0
+    text = metrics.prometheus()
+    assert "# TYPE cipher_calls_total counter" in text
+    assert 'cipher_phase_runs_total{cipher="playfair",mode="encrypt",phase="prepare"} 2' in text
+    assert "vigenere encrypt: 1 calls, 12 chars" in metrics.format_table()
+    metrics.reset()
+    assert metrics.snapshot() == {}
+    # The environment variable switches collection on at import
+    code = "from logic import metrics, CaesarCipher; CaesarCipher().encrypt('A', 1); print(metrics.snapshot()['caesar']['encrypt']['calls'])"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         env=dict(os.environ, CIPHER_METRICS="1"))
+    assert out.stdout.strip() == "1"
+
 if __name__ == "__main__":
     test_ciphers()
+    test_caesar_translate()
+    test_trace_modes()
+    test_vigenere_engines()
+    test_playfair_compiled_key()
+    test_streaming()
+    test_cli()
+    test_parallel()
+    test_benchmark_gate()
+    test_caesar_crack()
+    test_vigenere_crack()
+    test_playfair_solver()
+    test_encrypt_into()
+    test_key_cache()
+    test_lazy_registry()
+    test_service()
+    test_batch()
+    test_file_transform()
+    test_metrics()